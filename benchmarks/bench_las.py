@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Compare LASReader against the data path it replaced, np.loadtxt with a
+structured dtype, on the Ascii section of a large, synthetic LAS file.
+LASReader is timed both with the tokenizer chosen for the installed numpy
+and with the bulk np.fromstring tokenizer used before numpy 1.23.
+
+    PYTHONPATH=. python benchmarks/bench_las.py
+"""
+
+import os
+import tempfile
+import timeit
+
+import numpy as np
+
+import rppy
+
+
+HEADER = """~Version Information Section
+VERS.   2.0 : CWLS Log ASCII Standard - VERSION 2.0
+WRAP.   NO  : One Line per depth Step
+~Well Information Section
+NULL.     -999.25 : Null Value
+~Curve Information Section
+"""
+
+
+def write_las(path, n, ncurves):
+    rng = np.random.RandomState(0)
+    data = rng.uniform(0, 5000, (n, ncurves))
+    data[:, 0] = np.arange(n)*0.1524
+    with open(path, 'w') as f:
+        f.write(HEADER)
+        for i in range(ncurves):
+            f.write('C%d .M : Curve %d\n' % (i, i))
+        f.write('~Ascii\n')
+        np.savetxt(f, data, fmt='%12.4f')
+
+
+def baseline(path):
+    # The previous LASReader: np.loadtxt into a structured array with one
+    # float field per curve, then a 2D view of it.
+    names = []
+    section = None
+    with open(path) as f:
+        for line in f:
+            if line.startswith('~C'):
+                section = 'C'
+            elif line.startswith('~A'):
+                break
+            elif line.startswith('~'):
+                section = None
+            elif section == 'C':
+                names.append(line.split('.')[0].strip())
+        dt = np.dtype([(name, float) for name in names])
+        data = np.loadtxt(f, dtype=dt)
+    return(data.view(float).reshape(-1, len(names)))
+
+
+def reader(path):
+    return(rppy.las.LASReader(path).data2d)
+
+
+def fromstring(path):
+    c_loadtxt = rppy.las._C_LOADTXT
+    rppy.las._C_LOADTXT = False
+    try:
+        return(rppy.las.LASReader(path).data2d)
+    finally:
+        rppy.las._C_LOADTXT = c_loadtxt
+
+
+if __name__ == '__main__':
+    n, ncurves = 500000, 10
+    path = os.path.join(tempfile.mkdtemp(), 'bench.las')
+    write_las(path, n, ncurves)
+
+    assert np.array_equal(baseline(path), reader(path))
+    assert np.array_equal(baseline(path), fromstring(path))
+
+    print('%d rows x %d curves, %.0f MB, numpy %s' %
+          (n, ncurves, os.path.getsize(path)/1e6, np.__version__))
+    for f in [baseline, reader, fromstring]:
+        t = min(timeit.repeat(lambda: f(path), number=1, repeat=3))
+        print('%-10s %8.4f s' % (f.__name__, t))
+    os.remove(path)
@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Compare moduli conversions of a whole log in one call against a
+per-sample loop.
+
+    PYTHONPATH=. python benchmarks/bench_moduli.py
+"""
+
+import timeit
+
+import numpy as np
+
+import rppy
+
+
+def loop(Vp, Vs, rho):
+    out = np.empty((4, len(Vp)))
+    for i in range(len(Vp)):
+        u = rppy.moduli.shear(Vp=Vp[i], Vs=Vs[i], rho=rho[i])
+        K = rppy.moduli.bulk(Vp=Vp[i], Vs=Vs[i], rho=rho[i])
+        out[0, i] = u
+        out[1, i] = K
+        out[2, i] = rppy.moduli.youngs(u=u, K=K)
+        out[3, i] = rppy.moduli.poissons(u=u, K=K)
+    return(out)
+
+
+def whole_log(Vp, Vs, rho):
+    u = rppy.moduli.shear(Vp=Vp, Vs=Vs, rho=rho)
+    K = rppy.moduli.bulk(Vp=Vp, Vs=Vs, rho=rho)
+    return(np.array([u, K, rppy.moduli.youngs(u=u, K=K),
+                     rppy.moduli.poissons(u=u, K=K)]))
+
+
+if __name__ == '__main__':
+    rng = np.random.RandomState(0)
+    n = 20000
+    Vp = rng.uniform(2000, 5000, n)
+    Vs = Vp/rng.uniform(1.6, 2.2, n)
+    rho = rng.uniform(2000, 2700, n)
+
+    assert np.allclose(loop(Vp, Vs, rho), whole_log(Vp, Vs, rho))
+
+    print('%d log samples' % n)
+    for f in [loop, whole_log]:
+        t = min(timeit.repeat(lambda: f(Vp, Vs, rho), number=1, repeat=3))
+        print('%-10s %8.4f s  %12.0f samples/s' % (f.__name__, t, n/t))
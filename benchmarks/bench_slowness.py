@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Compare the batched velocity surface against a per-direction loop of
+Christoffel matrices and np.linalg.eig calls.
+
+    PYTHONPATH=. python benchmarks/bench_slowness.py
+"""
+
+import timeit
+
+import numpy as np
+
+import rppy
+
+
+def loop(C, p, n):
+    v = np.empty(C.shape[:1] + n.shape[:1] + (3,))
+    for i in range(C.shape[0]):
+        for j in range(n.shape[0]):
+            w, ev = np.linalg.eig(rppy.reflectivity.christoffel(C[i], n[j]))
+            v[i, j] = np.sqrt(np.sort(w.real)[::-1] / p)
+    return(v)
+
+
+def batched(C, p, n):
+    return(rppy.slowness.velocity_surface(C[:, None], p, n[None, :]))
+
+
+if __name__ == '__main__':
+    e = np.linspace(0, 0.3, 20)
+    C = rppy.reflectivity.Cij(3000, 1500, 2000, e, e/2, e, e, e/2, e, 0)
+    theta, phi = np.meshgrid(np.arange(0, 91, 5), np.arange(0, 360, 10))
+    n = rppy.slowness.direction(theta.ravel(), phi.ravel())
+
+    assert np.allclose(loop(C, 2000, n), batched(C, 2000, n)['phase'])
+
+    print('%d stiffness matrices x %d directions' % (len(C), len(n)))
+    for f in [loop, batched]:
+        t = min(timeit.repeat(lambda: f(C, 2000, n), number=1, repeat=3))
+        print('%-8s %8.4f s' % (f.__name__, t))
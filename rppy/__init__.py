@@ -33,6 +33,10 @@ from . import las
 from . import moduli
 from . import reflectivity
 from . import media
+from . import slowness
+from . import offset
+from . import synthetic
+from . import kennett
 
 
 __author__ = 'Sean Contenti'
@@ -0,0 +1,295 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#   rppy - a geophysical library for Python
+#   Copyright (c) 2014, Sean M. Contenti
+#   All rights reserved.
+#
+#   Redistribution and use in source and binary forms, with or without
+#   modification, are permitted provided that the following conditions are met:
+#
+#   1. Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+#
+#   2. Redistributions in binary form must reproduce the above copyright
+#   notice, this list of conditions and the following disclaimer in the
+#   documentation and/or other materials provided with the distribution.
+#
+#   THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+#   "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED
+#   TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#   PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#   CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#   EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#   PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS;
+#   OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+#   WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR
+#   OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF
+#   ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+import concurrent.futures
+import functools
+
+import numpy as np
+
+from .reflectivity import scattering_matrix, vertical_slowness
+from .synthetic import WaveletBank, _fft_length
+from .util import thickness
+
+
+def _layers(vp, vs, rho, z):
+    """
+    Layer properties and thicknesses of a set of logs, with runs of
+    identical samples merged into single layers. The interfaces between
+    identical samples are transparent, so this changes nothing but the
+    number of interfaces the recursion has to visit.
+    """
+    vp, vs, rho = [np.asarray(x, dtype=float) for x in (vp, vs, rho)]
+    h = thickness(z)
+
+    keep = np.concatenate([[True], (vp[1:] != vp[:-1]) |
+                                   (vs[1:] != vs[:-1]) |
+                                   (rho[1:] != rho[:-1])])
+    h = np.bincount(np.cumsum(keep) - 1, weights=h)
+
+    return(vp[keep], vs[keep], rho[keep], h)
+
+
+def _mul(A, B):
+    """
+    Product of two stacks of 2x2 matrices held as (a11, a12, a21, a22).
+    """
+    return((A[0]*B[0] + A[1]*B[2], A[0]*B[1] + A[1]*B[3],
+            A[2]*B[0] + A[3]*B[2], A[2]*B[1] + A[3]*B[3]))
+
+
+def _solve_right(A, M):
+    """
+    A M^-1 for two stacks of 2x2 matrices held as (a11, a12, a21, a22).
+    """
+    r = 1/(M[0]*M[3] - M[1]*M[2])
+    return(((A[0]*M[3] - A[1]*M[2])*r, (A[1]*M[0] - A[0]*M[1])*r,
+            (A[2]*M[3] - A[3]*M[2])*r, (A[3]*M[0] - A[2]*M[1])*r))
+
+
+def _shift(R, eP, eS):
+    """
+    Reflection matrix R carried up through a layer with one-way phase
+    shifts eP and eS, i.e. E R E with E = diag(eP, eS).
+    """
+    ePS = eP*eS
+    return((R[0]*eP*eP, R[1]*ePS, R[2]*ePS, R[3]*eS*eS))
+
+
+def _free_surface(vp, vs, p):
+    """
+    Reflection matrix of a free surface for up-going P and S waves in the
+    top layer (Aki and Richards [1980], eq. 5.31), held as (PP, SP, PS, SS)
+    with the incident wave along the columns as in scattering_matrix.
+    """
+    qp = vertical_slowness(vp, p)
+    qs = vertical_slowness(vs, p)
+    a = (1/vs**2 - 2*p**2)**2
+    b = 4*p**2*qp*qs
+    c = 4*p*(1/vs**2 - 2*p**2)/(a + b)
+
+    return(((b - a)/(a + b), vs/vp*qs*c, vp/vs*qp*c, (a - b)/(a + b)))
+
+
+def _phase(omega, step, qh):
+    """
+    Phase shifts exp(i omega qh), shape (n_p, n_omega), for vertical
+    slowness-thicknesses qh of shape (n_p, 1). On a frequency axis evenly
+    spaced by step, such as that of an FFT, they are built up by a running
+    product from the first frequency, which is several times cheaper than
+    the complex exponential.
+    """
+    if step is None:
+        return(np.exp(1j*omega*qh))
+
+    E = np.empty(np.broadcast(qh, omega).shape, dtype=complex)
+    E[:, :1] = np.exp(1j*omega[0]*qh)
+    E[:, 1:] = np.exp(1j*step*qh)
+    return(np.cumprod(E, axis=1, out=E))
+
+
+def _response_block(vp, vs, rho, h, free_surface, block, tile):
+    """
+    Kennett recursion for one tile of ray parameters and frequencies,
+    tile = (p, omega). Returns the 2x2 reflection matrix at the datum, held
+    as (PP, SP, PS, SS), each of shape (n_p, n_omega).
+    """
+    p, omega = tile
+    p = p[:, None]
+    qp = vertical_slowness(vp[:, None, None], p)
+    qs = vertical_slowness(vs[:, None, None], p)
+
+    step = np.diff(omega)
+    if len(step) < 2 or not np.allclose(step, step[0], rtol=1e-12, atol=0):
+        step = None
+    else:
+        step = step[0]
+
+    R = (0j, 0j, 0j, 0j)
+    for top in range(len(vp) - 1 - block, -block, -block):
+        # Scattering matrices for a block of interfaces, bottom up.
+        j = slice(max(top, 0), top + block)
+        Z = scattering_matrix(vp[j, None], vs[j, None], rho[j, None],
+                              vp[j.start + 1:j.stop + 1, None],
+                              vs[j.start + 1:j.stop + 1, None],
+                              rho[j.start + 1:j.stop + 1, None], p[:, 0])
+        Z = Z[..., None, :, :]
+
+        for k in range(Z.shape[0] - 1, -1, -1):
+            n = j.start + k + 1
+            z = Z[k]
+            Rd = (z[..., 0, 0], z[..., 0, 1], z[..., 1, 0], z[..., 1, 1])
+            Td = (z[..., 2, 0], z[..., 2, 1], z[..., 3, 0], z[..., 3, 1])
+            Tu = (z[..., 0, 2], z[..., 0, 3], z[..., 1, 2], z[..., 1, 3])
+            Ru = (z[..., 2, 2], z[..., 2, 3], z[..., 3, 2], z[..., 3, 3])
+
+            # Carry the response below interface n - 1 up through layer n,
+            # and add the interface with all of its internal multiples.
+            Rb = _shift(R, _phase(omega, step, qp[n]*h[n]),
+                        _phase(omega, step, qs[n]*h[n]))
+            B = _mul(Ru, Rb)
+            M = (1 - B[0], -B[1], -B[2], 1 - B[3])
+            Y = _mul(_solve_right(_mul(Tu, Rb), M), Td)
+            R = (Rd[0] + Y[0], Rd[1] + Y[1], Rd[2] + Y[2], Rd[3] + Y[3])
+
+    # Up to the datum through the top layer.
+    R = _shift(R, _phase(omega, step, qp[0]*h[0]),
+               _phase(omega, step, qs[0]*h[0]))
+
+    if free_surface:
+        F = _free_surface(vp[0], vs[0], p)
+        FR = _mul(F, R)
+        R = _solve_right(R, (1 - FR[0], -FR[1], -FR[2], 1 - FR[3]))
+
+    shape = (len(p), len(omega))
+    return([np.broadcast_to(r, shape) for r in R])
+
+
+def layer_response(vp, vs, rho, z, p, omega, free_surface=False,
+                   workers=None, block=256):
+    """
+    Plane-wave reflection response of a stack of isotropic, elastic layers
+    by the Kennett [1983] recursion, with all internal multiples, mode
+    conversions and transmission losses. Each log sample is a layer
+    filling the interval above its depth, as in offset.rms_velocity; the
+    source and receivers are at the datum (depth zero) and the last sample
+    is the underlying half-space.
+
+    Starting from the half-space, the reflection matrix of the stack is
+    carried up one interface at a time,
+
+        R = Rd + Tu E R E (I - Ru E R E)^-1 Td,
+
+    using the exact scattering matrices of scattering_matrix and the phase
+    shifts E across every layer. Each step is elementwise complex
+    arithmetic on explicit 2x2 matrices, vectorized across tiles of
+    frequencies and ray parameters; adjacent identical samples are merged
+    before the recursion.
+
+    Returns a dictionary of complex arrays of shape (n_p, n_omega) with
+    keys 'Rpp', 'Rps', 'Rsp' and 'Rss' (incident down-going mode first).
+    The time convention is exp(-i omega t) of Aki and Richards [1980],
+    with vertical slownesses on the positive imaginary branch, so omega
+    may carry a positive imaginary part to damp late arrivals. Layers must
+    have non-zero shear velocity.
+
+    :param vp: Compressional velocity log.
+    :param vs: Shear velocity log.
+    :param rho: Density log.
+    :param z: Depth of each log sample.
+    :param p: Ray parameters (horizontal slownesses).
+    :param omega: Angular frequencies.
+    :param free_surface: Include the free surface at the datum, and so all
+                         surface-related multiples.
+    :param workers: Number of processes to spread the ray parameters and
+                    frequencies over, in tiles. None (default) runs
+                    serially.
+    :param block: Number of interfaces for which scattering matrices are
+                  held in memory at once.
+    """
+    vp, vs, rho, h = _layers(vp, vs, rho, z)
+    p = np.atleast_1d(np.asarray(p, dtype=float))
+    omega = np.atleast_1d(np.asarray(omega, dtype=complex))
+
+    # Tiles of a few thousand elements keep every intermediate of the
+    # recursion in cache.
+    n_p = min(len(p), 16)
+    n_omega = max(8192//n_p, 1)
+    ip = range(0, len(p), n_p)
+    iw = range(0, len(omega), n_omega)
+    tiles = [(p[i:i + n_p], omega[j:j + n_omega]) for i in ip for j in iw]
+
+    f = functools.partial(_response_block, vp, vs, rho, h, free_surface,
+                          block)
+    if workers is None:
+        parts = list(map(f, tiles))
+    else:
+        with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+            parts = list(executor.map(f, tiles))
+
+    R = [np.empty((len(p), len(omega)), dtype=complex) for n in range(4)]
+    for (i, j), part in zip([(i, j) for i in ip for j in iw], parts):
+        for r, x in zip(R, part):
+            r[i:i + n_p, j:j + n_omega] = x
+
+    return({'Rpp': R[0], 'Rsp': R[1], 'Rps': R[2], 'Rss': R[3]})
+
+
+def plane_wave_gather(vp, vs, rho, z, p, wavelet, dt, nt,
+                      free_surface=False, workers=None):
+    """
+    Plane-wave (tau-p) synthetic gather of a set of well logs by the
+    reflectivity method, i.e. layer_response evaluated at every frequency
+    of the transform, multiplied by the wavelet spectrum and transformed
+    back to time. Unlike synthetic_gather, it includes all internal
+    multiples and converted waves, and the transmission losses down to
+    every reflector.
+
+    The frequencies carry an imaginary part, removed again after the
+    inverse transform, that attenuates arrivals later than the transform
+    length before they wrap around (Phinney [1965]).
+
+    Returns a dictionary with keys 't' (time axis, shape (nt,)), and 'Rpp'
+    and 'Rps' (gathers of up-going P and S for a down-going P source, both
+    of shape (nt, n_p)).
+
+    :param vp: Compressional velocity log.
+    :param vs: Shear velocity log.
+    :param rho: Density log.
+    :param z: Depth of each log sample.
+    :param p: Ray parameters (horizontal slownesses).
+    :param wavelet: Wavelet sampled at dt, centred on its middle sample, or
+                    a WaveletBank of one wavelet.
+    :param dt: Sample rate of the gather, in the time units of vp and z.
+    :param nt: Number of samples.
+    :param free_surface: Include the free surface at the datum.
+    :param workers: Number of processes (see layer_response).
+    """
+    if isinstance(wavelet, WaveletBank):
+        wavelet = wavelet.wavelet
+    wavelet = np.asarray(wavelet, dtype=float)
+    c = (len(wavelet) - 1)//2
+
+    nfft = _fft_length(nt + len(wavelet) - 1)
+    sigma = np.log(100)/(nfft*dt)
+    t = np.arange(nt)*dt
+
+    # The damped wavelet, and the damped response at the same frequencies;
+    # the response is conjugated to the exp(-i omega t) of np.fft.
+    W = np.fft.rfft(wavelet*np.exp(-sigma*(np.arange(len(wavelet)) - c)*dt),
+                    nfft)
+    omega = 2*np.pi*np.fft.rfftfreq(nfft, dt) + 1j*sigma
+    R = layer_response(vp, vs, rho, z, p, omega, free_surface=free_surface,
+                       workers=workers)
+
+    out = {'t': t}
+    for key in ['Rpp', 'Rps']:
+        s = np.fft.irfft(np.conj(R[key])*W, nfft, axis=-1)
+        out[key] = (s[:, c:c + nt]*np.exp(sigma*t)).T
+
+    return(out)
@@ -19,8 +19,14 @@ and makes the data available as a Python object.
 # OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS SOFTWARE.
 
 
+import io
+import os
 import re
+import json
+import hashlib
 import keyword
+import warnings
+import itertools
 
 import numpy as np
 
@@ -93,33 +99,179 @@ class LASItem(object):
                        descr=descr.strip())
 
 
-def _read_wrapped_row(f, n):
-    """Read a "row" of data from the Ascii section of a "wrapped" LAS file.
+# From numpy 1.23 np.loadtxt is implemented in C, and is the fastest way to
+# tokenize an unwrapped Ascii section; before that it was pure Python and
+# very slow.
+_C_LOADTXT = np.lib.NumpyVersion(np.__version__) >= '1.23.0'
 
-    `f` must be a file object opened for reading.
-    `n` is the number of fields in the row.
 
-    Returns the list of floats read from the file.
+def _parse_values(text):
+    """Tokenize the text of an Ascii section in a single pass.
+
+    Returns a flat array of floats holding every value in `text`, in
+    order.  Comment lines (starting with '#') are skipped, and anything
+    else that is not a number raises a LASError.
+    """
+    if not text or text.isspace():
+        # np.fromstring parses a blank string as [-1.]
+        return np.empty(0)
+    try:
+        with warnings.catch_warnings():
+            # Older versions of numpy warn on unparsable data, and return
+            # what they read up to it.
+            warnings.simplefilter('error', DeprecationWarning)
+            return np.fromstring(text, dtype=float, sep=' ')
+    except (ValueError, DeprecationWarning):
+        pass
+
+    lines = [line for line in text.splitlines()
+             if not line.lstrip().startswith('#')]
+    try:
+        return np.array(' '.join(lines).split(), dtype=float)
+    except ValueError as e:
+        raise LASError("Malformed Ascii section: %s" % e)
+
+
+def _read_data(f, ncols, wrap=False, usecols=None, dtype=float):
+    """Read the Ascii section of a LAS file in bulk.
+
+    `f` must be a file object positioned just after the '~A' line.
+    `ncols` is the number of curves in the Curve section.
+    `wrap` is True if the file is wrapped.
+    `usecols` is a list of the indices of the curves to read, or None to
+    read all of them, and `dtype` the type of float to store them as.
+
+    Returns a C-contiguous 2D array with one row per depth step.  The
+    values are tokenized in a single pass into a flat buffer of floats,
+    which is returned as is unless it has to be cut down to `usecols` or
+    converted to `dtype`.  A wrapped row holds its values in the same
+    order as an unwrapped one, just spread over several lines, so both
+    are read the same way: the rest of the file is read at once and
+    parsed by _parse_values().  Unwrapped sections are parsed by
+    np.loadtxt instead where that is implemented in C, and then only the
+    values of the selected curves are converted and stored.
     """
-    depth = float(f.readline().strip())
-    values = [depth]
-    while len(values) < n:
-        new_values = [float(s) for s in f.readline().split()]
-        values.extend(new_values)
-    return values
+    if _C_LOADTXT and not wrap:
+        n = ncols if usecols is None else len(usecols)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', UserWarning)
+            try:
+                values = np.loadtxt(f, ndmin=2, usecols=usecols, dtype=dtype)
+            except ValueError as e:
+                raise LASError("Malformed Ascii section: %s" % e)
+        if values.size == 0:
+            values = np.empty((0, n), dtype=dtype)
+        if values.shape[1] != n:
+            raise LASError("Number of columns in the Ascii section (%d) "
+                           "does not match the number of curves (%d)." %
+                           (values.shape[1], n))
+        return values
+
+    values = _parse_values(f.read())
+    if values.size % ncols != 0:
+        raise LASError("Number of values in the Ascii section (%d) is not "
+                       "a multiple of the number of curves (%d)." %
+                       (values.size, ncols))
+    values = values.reshape(-1, ncols)
+    if usecols is not None:
+        values = values[:, usecols]
+    return np.ascontiguousarray(values, dtype=dtype)
+
+
+def _iter_data(f, ncols, rows, wrap=False, usecols=None, dtype=float):
+    """Read the Ascii section of a LAS file in chunks.
+
+    Arguments are as for _read_data(), with `rows` the number of depth
+    steps in each chunk.  Yields C-contiguous 2D arrays of `rows` rows,
+    and a shorter one at the end, reading no more than about `rows` lines
+    of the file at a time.  The values of a wrapped row may straddle two
+    reads, so those left over from one read are carried to the next.
+    """
+    pending = np.empty((0, ncols if usecols is None else len(usecols)),
+                       dtype=dtype)
+    left = np.empty(0)
+    while True:
+        lines = list(itertools.islice(f, rows))
+        if wrap:
+            values = np.concatenate([left, _parse_values(''.join(lines))])
+            n = values.size - values.size % ncols
+            left = values[n:]
+            block = values[:n].reshape(-1, ncols)
+            if usecols is not None:
+                block = block[:, usecols]
+            block = np.ascontiguousarray(block, dtype=dtype)
+        else:
+            block = _read_data(io.StringIO(''.join(lines)), ncols,
+                               usecols=usecols, dtype=dtype)
 
+        if len(pending):
+            block = np.concatenate([pending, block])
+        while len(block) >= rows or (len(block) and not lines):
+            yield block[:rows]
+            block = block[rows:]
+        pending = block
 
-def _read_wrapped_data(f, dt):
-    data = []
-    ncols = len(dt.names)
-    while True:
-        try:
-            row = _read_wrapped_row(f, ncols)
-        except Exception:
+        if not lines:
             break
-        data.append(tuple(row))
-    data = np.array(data, dtype=dt)
-    return data
+
+    if left.size:
+        raise LASError("Number of values in the Ascii section is not a "
+                       "multiple of the number of curves (%d)." % ncols)
+
+
+# Version of the layout of the cache files written by LASReader.
+_CACHE_FORMAT = 1
+
+# Attributes of a LASReader, other than its sections, kept in the cache.
+_CACHE_ATTRS = ['wrap', 'vers', 'null', 'start', 'start_units', 'stop',
+                'stop_units', 'step', 'step_units', 'other']
+
+
+def _file_stamp(path, block=65536):
+    """Identify the contents of the file `path` without reading all of it.
+
+    Returns a dictionary with the size and modification time of the file,
+    and a SHA-1 hash of its first, middle and last `block` bytes.
+    """
+    st = os.stat(path)
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for offset in [0, st.st_size//2, max(st.st_size - block, 0)]:
+            f.seek(offset)
+            h.update(f.read(block))
+    return {'size': st.st_size, 'mtime': st.st_mtime, 'sha1': h.hexdigest()}
+
+
+def _cache_paths(path, cache):
+    """Paths of the data (.npy) and header (.json) cache files of `path`.
+
+    If `cache` is True they sit next to the LAS file; otherwise `cache`
+    is the directory holding them, and their names include a hash of the
+    absolute path of the LAS file, so that files of the same name in
+    different directories don't collide.
+    """
+    if cache is True:
+        base = path
+    else:
+        key = hashlib.sha1(os.path.abspath(path).encode('utf-8'))
+        base = os.path.join(cache, '%s-%s' % (os.path.basename(path),
+                                              key.hexdigest()[:16]))
+    return base + '.npy', base + '.json'
+
+
+def _replace(path, write, mode='w'):
+    """Write the file `path` atomically, so that concurrent readers see
+    either the old or the new file.  `write` is called with a temporary
+    file object, opened with `mode`, that then replaces `path`.
+    """
+    tmp = '%s.%d.tmp' % (path, os.getpid())
+    try:
+        with open(tmp, mode) as f:
+            write(f)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
 
 
 class LASSection(object):
@@ -175,13 +327,39 @@ class LASReader(object):
 
     Constructor
     -----------
-    LASReader(f, null_subs=None)
+    LASReader(f, null_subs=None, cache=None, curves=None, dtype=float,
+              lazy=False)
 
     f : file object or string
         If f is a file object, it must be opened for reading.
         If f is a string, it must be the filename of a LAS file.
         In that case, the file will be opened and read.
 
+    cache : None, True or string
+        If given, and f is a filename, the parsed file is cached: the
+        header sections in a JSON file, and the data in a .npy file.
+        With True the cache files are written next to the LAS file, as
+        f + '.json' and f + '.npy'; otherwise cache is the directory to
+        keep them in.  Later readers of the same file check its size,
+        modification time and a hash of part of its contents against
+        the cache and, if they match, memory-map the data instead of
+        parsing the file.  The mapped pages are shared between
+        processes reading the same file.
+
+    curves : list of str, optional
+        Mnemonics of the curves to read, in the order wanted in `data`.
+        By default every curve is read.  The header, including the
+        '~C' section, is always read in full.
+
+    dtype : float type, optional
+        Type of float to hold the data in, e.g. np.float32 to halve
+        the memory of the data.  The default is float64.
+
+    lazy : bool, optional
+        If True, only the header is read by the constructor, and the
+        data is read on first access to `data` or `data2d`.  This
+        needs f to be a filename.
+
     Attributes for LAS Sections
     ---------------------------
     version : LASSection instance
@@ -202,13 +380,15 @@ class LASReader(object):
     data : numpy 1D structured array
         The numerical data from the '~A' section.  The data type
         of the array is constructed from the items in the '~C'
-        section.
+        section, or from the curves selected in the constructor.
 
     Other attributes
     ----------------
     data2d : numpy 2D array of floats
         The numerical data from the '~A' section, as a 2D array.
         This is a view of the same data as in the `data` attribute.
+        Both can be assigned to; assigning one does not change the
+        other.
 
     wrap : bool
         True if the LAS file was wrapped. (More specifically, this
@@ -254,14 +434,25 @@ class LASReader(object):
         Units of the 'STEP' item from the '~W' section.
         The value will be None if 'STEP' was not given in the file.
 
+    cached : bool
+        True if the file was read from its cache.
+
     """
 
-    def __init__(self, f, null_subs=None):
+    def __init__(self, f, null_subs=None, cache=None, curves=None,
+                 dtype=float, lazy=False):
         """f can be a filename (str) or a file object.
 
         If 'null_subs' is not None, its value replaces any values in the data
         that matches the NULL value specified in the Version section of the LAS
         file.
+
+        If 'cache' is not None, and f is a filename, the parsed file is cached
+        (see the class docstring).
+
+        'curves', 'dtype' and 'lazy' select the curves to read, the type of
+        float to hold them in and whether to defer reading them (see the class
+        docstring).
         """
         self.null = None
         self.null_subs = null_subs
@@ -277,30 +468,248 @@ class LASReader(object):
         self.curves = LASSection()
         self.parameters = LASSection()
         self.other = ''
-        self.data = None
-
-        self._read_las(f)
+        self.cached = False
+
+        self._data = None
+        self._data2d = None
+        self._select = curves
+        self._dtype = np.dtype(dtype)
+        self._path = None
+        self._offset = None
+        self._cache = None
+
+        if isinstance(f, str) and (cache is not None or lazy):
+            self._path = f
+            if cache is not None:
+                self._cache = _cache_paths(f, cache) + (_file_stamp(f),)
+                self.cached = self._read_cached_header()
+            if not self.cached:
+                with open(f, 'r') as fh:
+                    self._read_header(fh)
+                    self._offset = fh.tell()
+            if not lazy:
+                self._load()
+        elif lazy:
+            raise ValueError("Lazy reading needs the filename of a LAS file.")
+        else:
+            self._read_las(f)
+
+    @property
+    def data(self):
+        if self._data is None:
+            self._load()
+        return self._data
+
+    @data.setter
+    def data(self, value):
+        self._data = value
+
+    @property
+    def data2d(self):
+        if self._data2d is None:
+            self._load()
+        return self._data2d
+
+    @data2d.setter
+    def data2d(self, value):
+        self._data2d = value
+
+    def _usecols(self):
+        """Indices of the selected curves, or None for all of them."""
+        if self._select is None:
+            return None
+        for name in self._select:
+            if name not in self.curves.items:
+                raise LASError("Unknown curve '%s'." % name)
+        return [self.curves.names.index(name) for name in self._select]
+
+    def _records(self, values, usecols):
+        """Structured view of the 2D array `values`, of the curves
+        `usecols`, substituting nulls in it if that was asked for.
+        """
+        names = self.curves.names
+        if usecols is not None:
+            names = [names[i] for i in usecols]
+        dt = np.dtype([(name, values.dtype) for name in names])
+        if self.null_subs is not None and self.null is not None:
+            values[values == values.dtype.type(self.null)] = self.null_subs
+        return values.reshape(-1).view(dt)
+
+    def _set_data(self, values, usecols):
+        """Hold the 2D array `values`, of the curves `usecols`, as the data
+        of the file, unless `data` or `data2d` has been assigned already.
+        """
+        records = self._records(values, usecols)
+        if self._data is None:
+            self._data = records
+        if self._data2d is None:
+            self._data2d = values
+
+    def chunks(self, rows=65536, structured=True):
+        """Iterate over the data in chunks of `rows` depth steps (the last
+        chunk may be shorter), with the selection of curves, type of float
+        and substitution of nulls of the reader.
+
+        Each chunk is a structured array like `data`, or a 2D array like
+        `data2d` if `structured` is False.  For a lazy reader whose data
+        has not been read, the Ascii section is streamed from the file, so
+        no more than about one chunk is ever held in memory; a cached file
+        is streamed from its memory-mapped cache.  Otherwise the chunks are
+        views of the data already read or assigned.
+        """
+        usecols = self._usecols()
+        f = None
+        loaded = self._data is not None or self._data2d is not None
+        if loaded:
+            values = self.data if structured else self.data2d
+            source = (values[i:i + rows] for i in range(0, len(values), rows))
+        elif self.cached:
+            values = np.load(self._cache[0], mmap_mode='r')
+            source = (np.array(values[i:i + rows] if usecols is None else
+                               values[i:i + rows, usecols], dtype=self._dtype)
+                      for i in range(0, len(values), rows))
+        else:
+            f = open(self._path, 'r')
+            f.seek(self._offset)
+            source = _iter_data(f, len(self.curves.names), rows,
+                                wrap=self.wrap, usecols=usecols,
+                                dtype=self._dtype)
 
-        self.data2d = self.data.view(float).reshape(-1, len(self.curves.items))
-        if null_subs is not None:
-            self.data2d[self.data2d == self.null] = null_subs
+        try:
+            for block in source:
+                if loaded:
+                    yield block
+                else:
+                    records = self._records(block, usecols)
+                    yield records if structured else block
+        finally:
+            if f is not None:
+                f.close()
+
+    def _load(self, f=None):
+        """Read the data: from the cache if it is up to date, otherwise from
+        the file object `f`, or by opening the file and seeking to its Ascii
+        section.  When caching, every curve is read and cached as float64,
+        and the selection is made afterwards.
+        """
+        usecols = self._usecols()
+        if self.cached:
+            npy = self._cache[0]
+            copy = usecols is not None or self._dtype != np.float64
+            # Substituting nulls writes to the data, so unless it is copied
+            # anyway, map it copy-on-write.
+            mode = 'r' if self.null_subs is None or copy else 'c'
+            try:
+                values = np.load(npy, mmap_mode=mode)
+                if usecols is not None:
+                    values = values[:, usecols]
+                if copy:
+                    values = np.ascontiguousarray(values, dtype=self._dtype)
+                self._set_data(values, usecols)
+                return
+            except (IOError, OSError, ValueError):
+                # The header was cached, but the data has gone; parse the
+                # file again, and rewrite the cache.
+                self.cached = False
+
+        if f is None:
+            with open(self._path, 'r') as f:
+                f.seek(self._offset)
+                return self._load(f)
+
+        ncols = len(self.curves.names)
+        if self._cache is None:
+            values = _read_data(f, ncols, wrap=self.wrap, usecols=usecols,
+                                dtype=self._dtype)
+        else:
+            values = _read_data(f, ncols, wrap=self.wrap)
+            self._write_cache(values)
+            if usecols is not None:
+                values = values[:, usecols]
+            values = np.ascontiguousarray(values, dtype=self._dtype)
+        self._set_data(values, usecols)
+
+    def _read_cached_header(self):
+        """Restore the header from the cache, if the cache is up to date.
+        Returns True if it was.
+        """
+        npy, meta, stamp = self._cache
+        try:
+            with open(meta) as f:
+                header = json.load(f)
+            if (header['format'] != _CACHE_FORMAT or
+                    header['stamp'] != stamp or
+                    os.path.getsize(npy) != header['npy_size']):
+                return False
+            self._load_header(header)
+            self._offset = header['offset']
+            return True
+        except (IOError, OSError, ValueError, KeyError):
+            # Missing or unreadable cache files are rebuilt.
+            return False
+
+    def _write_cache(self, values):
+        """Write the header and the 2D array `values`, holding every curve
+        as float64, to the cache.
+        """
+        npy, meta, stamp = self._cache
+        try:
+            _replace(npy, lambda f: np.save(f, values), mode='wb')
+            header = self._dump_header()
+            header.update(format=_CACHE_FORMAT, stamp=stamp,
+                          npy_size=os.path.getsize(npy), offset=self._offset)
+            _replace(meta, lambda f: json.dump(header, f))
+        except (IOError, OSError):
+            # The cache is only an optimization; e.g. the directory may
+            # be read-only.
+            pass
+
+    def _dump_header(self):
+        """The header sections and attributes of the file as a dictionary
+        that can be written as JSON.
+        """
+        header = dict((attr, getattr(self, attr)) for attr in _CACHE_ATTRS
+                      if hasattr(self, attr))
+        for name in ['version', 'well', 'curves', 'parameters']:
+            section = getattr(self, name)
+            header[name] = [[item.name, item.units, item.data, item.descr]
+                            for item in (section.items[n]
+                                         for n in section.names)]
+        return header
+
+    def _load_header(self, header):
+        """Restore the header sections and attributes written by
+        _dump_header().
+        """
+        for attr in _CACHE_ATTRS:
+            if attr in header:
+                setattr(self, attr, header[attr])
+        for name in ['version', 'well', 'curves', 'parameters']:
+            section = getattr(self, name)
+            for item in header[name]:
+                section.add_item(LASItem(*item))
 
     def _read_las(self, f):
-        """Read a LAS file.
-
-        Returns a dictionary with keys 'V', 'W', 'C', 'P', 'O' and 'A',
-        corresponding to the sections of a LAS file.  The values associated
-        with keys 'V', 'W', 'C' and 'P' will be lists of Item instances.  The
-        value associated with the 'O' key is a list of strings.  The value
-        associated with the 'A' key is a numpy structured array containing the
-        log data.  The field names of the array are the mnemonics from the
-        Curve section of the file.
+        """Read a LAS file: its header, into the sections and attributes of
+        the LASReader, and then its data.
         """
         opened_here = False
         if isinstance(f, str):
             opened_here = True
             f = open(f, 'r')
 
+        self._read_header(f)
+        self._load(f)
+
+        if opened_here:
+            f.close()
+
+    def _read_header(self, f):
+        """Read the header of a LAS file, leaving `f` just after the '~A'
+        line.  The items of the '~V', '~W', '~C' and '~P' sections are
+        added to the corresponding LASSections, and the '~O' section is
+        kept as a single string.
+        """
         self.wrap = False
 
         line = f.readline()
@@ -361,22 +770,6 @@ class LASReader(object):
                                 self.step_units = m.units
             line = f.readline()
 
-        # Finished reading the header--all that is left is the numerical
-        # data that follows the '~A' line.  We'll construct a structured
-        # data type, and, if the data is not wrapped, use numpy.loadtext
-        # to read the data into an array.  For wrapped rows, we use the
-        # function _read_wrapped() defined elsewhere in this module.
-        # The data type is determined by the items from the '~Curves' section.
-        dt = np.dtype([(name, float) for name in self.curves.names])
-        if self.wrap:
-            a = _read_wrapped_data(f, dt)
-        else:
-            a = np.loadtxt(f, dtype=dt)
-        self.data = a
-
-        if opened_here:
-            f.close()
-
 
 if __name__ == "__main__":
 
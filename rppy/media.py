@@ -29,6 +29,9 @@
 
 import numpy as np
 
+from .reflectivity import thomsen
+from .util import thickness
+
 
 def han_eberhart_phillips(phi, C, Pe):
     """
@@ -155,6 +158,80 @@ def voight_reuss_hill(M, f):
     return(v, r, h)
 
 
+def backus(vp, vs, rho, z, window):
+    """
+    Backus [1962] average of a set of isotropic well logs over a moving
+    window, giving the effective VTI medium of the finely layered logs at
+    the scale of the window (e.g. a third of the shortest seismic
+    wavelength, Liner and Fei [2006]).
+
+    Each log sample is a layer filling the interval above its depth, as in
+    offset.rms_velocity, and windows are centred on those intervals. The
+    running integrals of a blocky log are piecewise linear in depth, so a
+    single cumulative sum of each averaged quantity gives the exact
+    thickness-weighted average over any window by differencing. Every
+    window length costs O(n) and many can be evaluated together.
+
+    Returns a dictionary with the stiffnesses 'C11', 'C13', 'C33', 'C55'
+    and 'C66', the full stiffness matrix 'C' (shape (..., 6, 6)), the
+    average density 'rho', and the vertical velocities 'vp' and 'vs' and
+    Thomsen parameters 'e', 'd' and 'y' from reflectivity.thomsen. Each
+    has shape np.shape(window) + (n_samples,).
+
+    :param vp: Compressional velocity log.
+    :param vs: Shear velocity log.
+    :param rho: Density log.
+    :param z: Depth of each log sample.
+    :param window: Window length, or lengths, in the units of z.
+    """
+    vp, vs, rho = [np.asarray(x, dtype=float) for x in (vp, vs, rho)]
+    h = thickness(z)
+    M = rho*vp**2
+    u = rho*vs**2
+
+    # Quantities to average, and their integrals from the datum down to
+    # the base of every sample.
+    f = np.stack([rho, 1/M, u, 1/u, u/M, u**2/M])
+    zk = np.concatenate([[0.], np.cumsum(h)])
+    F = np.concatenate([np.zeros((len(f), 1)), np.cumsum(f*h, axis=1)],
+                       axis=1)
+
+    def integral(x):
+        i = np.minimum(np.searchsorted(zk, x, side='right') - 1, len(h) - 1)
+        return(F[:, i] + (x - zk[i])*f[:, i])
+
+    L = np.asarray(window, dtype=float)[..., None]
+    zc = zk[1:] - h/2
+    a = np.clip(zc - L/2, 0, zk[-1])
+    b = np.clip(zc + L/2, 0, zk[-1])
+    n = b - a
+    avg = (integral(b) - integral(a))/np.where(n > 0, n, 1)
+
+    # A window of zero length samples the logs themselves.
+    avg = np.where(n > 0, avg,
+                   f.reshape(f.shape[:1] + (1,)*(L.ndim - 1) + f.shape[1:]))
+    rho, iM, u, iu, uM, u2M = avg
+
+    C33 = 1/iM
+    C55 = 1/iu
+    C66 = u
+    C13 = C33*(1 - 2*uM)
+    C11 = 4*(u - u2M) + C33*(1 - 2*uM)**2
+
+    C = np.zeros(np.shape(C33) + (6, 6))
+    C[..., 0, 0] = C[..., 1, 1] = C11
+    C[..., 2, 2] = C33
+    C[..., 3, 3] = C[..., 4, 4] = C55
+    C[..., 5, 5] = C66
+    C[..., 0, 1] = C[..., 1, 0] = C11 - 2*C66
+    C[..., 0, 2] = C[..., 2, 0] = C[..., 1, 2] = C[..., 2, 1] = C13
+
+    vp, vs, e1, d1, y1, e, d, y, d3 = thomsen(C, rho)
+
+    return({'C11': C11, 'C13': C13, 'C33': C33, 'C55': C55, 'C66': C66,
+            'C': C, 'rho': rho, 'vp': vp, 'vs': vs, 'e': e, 'd': d, 'y': y})
+
+
 def hudson():
     """
     Hudson's model for cracked media, based on a scattering-theory analysis of
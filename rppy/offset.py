@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#   rppy - a geophysical library for Python
+#   Copyright (c) 2014, Sean M. Contenti
+#   All rights reserved.
+#
+#   Redistribution and use in source and binary forms, with or without
+#   modification, are permitted provided that the following conditions are met:
+#
+#   1. Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+#
+#   2. Redistributions in binary form must reproduce the above copyright
+#   notice, this list of conditions and the following disclaimer in the
+#   documentation and/or other materials provided with the distribution.
+#
+#   THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+#   "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED
+#   TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#   PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#   CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#   EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#   PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS;
+#   OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+#   WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR
+#   OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF
+#   ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+import numpy as np
+
+from .util import thickness
+
+
+def rms_velocity(vp, z):
+    """
+    Two-way vertical traveltime and RMS velocity down to the base of every
+    depth sample of an interval velocity log.
+
+    The log may come straight from LASReader curves, e.g.
+    rms_velocity(1e6/las.data['DT'], las.data['DEPT']). The interval from
+    the datum to the first sample is filled with the first velocity. Where
+    no time has yet elapsed, as at a first sample at depth zero, the RMS
+    velocity is the interval velocity.
+
+    :param vp: Interval compressional velocity log.
+    :param z: Depth of each log sample.
+    """
+    vp = np.asarray(vp, dtype=float)
+    dt = 2*thickness(z)/vp
+    t0 = np.cumsum(dt)
+    with np.errstate(invalid='ignore'):
+        vrms = np.where(t0 > 0, np.sqrt(np.cumsum(vp**2*dt)/t0), vp)
+
+    return(t0, vrms)
+
+
+def offset_to_angle(vp, z, offset, method='straight', n_p=1024, chunk=1000):
+    """
+    Incidence angle, in degrees, at the base of every depth sample of an
+    interval velocity log for every source-receiver offset. The result has
+    shape (n_samples, n_offsets).
+
+    Angles are those in the layer above each reflector, so that row n
+    matches interface n of reflectivity.interfaces and interface_avo.
+
+    method = 'straight' - Straight-ray approximation through the RMS
+                          velocity, sin(theta) = v x / (vrms^2 t_x) with
+                          t_x^2 = t0^2 + x^2/vrms^2 (default). NaN where
+                          this exceeds one.
+    method = 'raytrace' - Trace rays through the flat layered model. A fan
+                          of n_p ray parameters is shot through at most
+                          `chunk` samples at a time and the offset of each
+                          ray is interpolated back onto the requested
+                          offsets. Every offset is reached, by rays that
+                          approach grazing in the fastest layer crossed.
+
+    :param vp: Interval compressional velocity log.
+    :param z: Depth of each log sample.
+    :param offset: Source-receiver offsets, in the units of z.
+    :param method: Conversion to use, straight or raytrace.
+    :param n_p: Number of ray parameters in the ray-traced fan.
+    :param chunk: Number of depth samples traced at once.
+    """
+    vp = np.asarray(vp, dtype=float)
+    x = np.abs(np.atleast_1d(np.asarray(offset, dtype=float)))
+
+    if method == 'straight':
+        t0, vrms = rms_velocity(vp, z)
+        t0 = t0[:, None]
+        vrms = vrms[:, None]
+        tx = np.sqrt(t0**2 + x**2/vrms**2)
+        with np.errstate(invalid='ignore'):
+            s = np.where(x > 0, vp[:, None]*x/(vrms**2*tx), 0)
+            theta = np.degrees(np.arcsin(np.where(s <= 1, s, np.nan)))
+    elif method == 'raytrace':
+        dz = thickness(z)
+        theta = np.empty((len(vp), len(x)))
+
+        # The fan of ray parameters of each run of samples reaches up to the
+        # critical value of the fastest layer crossed, so runs are broken
+        # wherever a new fastest layer is met as well as every `chunk`
+        # samples.
+        vmax = np.maximum.accumulate(vp)
+        breaks = np.flatnonzero(np.diff(vmax)) + 1
+        breaks = np.union1d(breaks, np.arange(0, len(vp), chunk))
+        breaks = np.append(breaks, len(vp)).astype(int)
+
+        # Fan spaced evenly in the propagation angle phi of the fastest
+        # layer. When a faster layer is met the new fan lies inside the old
+        # one, so the offsets of the overlying samples are carried over by
+        # interpolation in tan(phi), in which they are close to linear.
+        phi = np.linspace(0, np.pi/2, n_p, endpoint=False)
+        V = vmax[0]
+        p = np.sin(phi)/V
+        X = np.zeros(n_p)
+        for start, stop in zip(breaks[:-1], breaks[1:]):
+            if vmax[start] != V:
+                p = np.sin(phi)/vmax[start]
+                X = np.interp(np.tan(np.arcsin(p*V)), np.tan(phi), X)
+                V = vmax[start]
+
+            # Running sum through the run; every row is monotonic in p.
+            Xc = X + np.cumsum(_ray_offsets(vp[start:stop], dz[start:stop],
+                                            p), axis=0)
+            X = Xc[-1]
+
+            # Offsets are close to linear in tan(phi) (exactly so for a
+            # single layer), which is interpolated and then mapped back to
+            # the ray parameter.
+            with np.errstate(divide='ignore', invalid='ignore'):
+                t = _invert_offsets(Xc, np.tan(phi), x)
+                pray = t/np.sqrt(1 + t**2)/V
+            theta[start:stop] = np.degrees(np.arcsin(pray *
+                                                     vp[start:stop, None]))
+
+        # Reflectors at the datum have no rays to interpolate; they are
+        # reached horizontally, as in the straight-ray limit.
+        theta[np.cumsum(dz) == 0] = np.where(x > 0, 90., 0.)
+    else:
+        raise ValueError("Unknown offset to angle method '%s'." % method)
+
+    return(theta)
+
+
+def _ray_offsets(v, h, p):
+    """
+    Offset, shape (n_samples, n_p), travelled down and back up through
+    layers of velocity v and thickness h by rays of parameter p.
+    """
+    return(2*h[:, None]*v[:, None]*p / np.sqrt(1 - p**2*v[:, None]**2))
+
+
+def _invert_offsets(X, t, x):
+    """
+    Interpolate the fan coordinate t reaching each offset x from a table X
+    of offsets, shape (n_rows, len(t)), increasing along each row. Offsets
+    past the end of a row are extrapolated from its last interval.
+    """
+    n = len(t)
+
+    # Offsetting each row by a multiple of a constant larger than any
+    # offset keeps the flattened table sorted, so every row is searched in
+    # one call.
+    cap = 2*np.max(np.abs(x)) + 1
+    rows = np.arange(len(X))[:, None]
+    idx = np.searchsorted((np.minimum(X, cap) + 2*cap*rows).ravel(),
+                          x + 2*cap*rows, side='right') - rows*n
+    idx = np.clip(idx, 1, n - 1)
+
+    X0 = X[rows, idx - 1]
+    X1 = X[rows, idx]
+
+    return(t[idx - 1] + (x - X0)*(t[idx] - t[idx - 1])/(X1 - X0))
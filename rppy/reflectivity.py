@@ -45,17 +45,12 @@ def shuey(vp1, vs1, rho1, vp2, vs2, rho2, theta1):
     """
     theta1 = np.radians(theta1)
     theta2, thetas1, thetas2, p = snell(vp1, vp2, vs1, vs2, theta1)
-    dvp = vp2 - vp1
-    drho = rho2 - rho1
-    dvs = vs2 - vs1
-    rho = (rho1 + rho2) / 2.
-    vs = (vs1 + vs2) / 2.
-    vp = (vp1 + vp2) / 2.
     theta = (theta1 + theta2)/2
 
-    A = 0.5*(dvp/vp + drho/rho)
-    B = 0.5*dvp/vp - 2*vs**2/vp**2*(drho/rho + 2*dvs/vs)
-    C = 0.5*dvp/vp
+    terms = shuey_terms(vp1, vs1, rho1, vp2, vs2, rho2)
+    A = terms[..., 0]
+    B = terms[..., 1]
+    C = terms[..., 2]
 
     Rpp = A + B*np.sin(theta)**2 + C*(np.tan(theta)**2 - np.sin(theta)**2)
 
@@ -91,10 +86,25 @@ def aki_richards(vp1, vs1, rho1, vp2, vs2, rho2, theta1):
     return(Rpp)
 
 
-def zoeppritz(vp1, vs1, rho1, vp2, vs2, rho2, theta1):
+def zoeppritz(vp1, vs1, rho1, vp2, vs2, rho2, theta1, method='matrix',
+              postcritical=False):
     """
-    Calculate the AVO response for a PP reflection based on the exact matrix
-    formulation of the Zoeppritz equations.
+    Calculate the AVO response for a PP reflection based on the exact
+    Zoeppritz equations.
+
+    All inputs are broadcast against each other, so any mix of scalars and
+    arrays (e.g. interfaces down one axis and angles along another) is solved
+    in a single batched call.
+
+    method = 'matrix' - Solve the 4x4 matrix formulation (default)
+    method = 'scattering' - Evaluate the closed-form scattering coefficients
+                            of Aki and Richards [1980]. No linear algebra is
+                            performed and the result is complex, so angles
+                            beyond the critical angle return the phase-shifted
+                            post-critical coefficient instead of NaN.
+
+    With postcritical=True the matrix formulation is solved in complex
+    arithmetic as well, giving the same phase-correct coefficients.
 
     :param vp1: Compressional velocity of upper layer.
     :param vs1: Shear velocity of upper layer.
@@ -103,54 +113,251 @@ def zoeppritz(vp1, vs1, rho1, vp2, vs2, rho2, theta1):
     :param vs2: Shear velocity of lower layer.
     :param rho2: Density of lower layer.
     :param theta1: Angle of incidence for P wave in upper layer.
+    :param method: Formulation to evaluate, matrix or scattering.
+    :param postcritical: Solve the matrix formulation in complex arithmetic.
     """
-    # Need reflection and refraction angles for Zoeppritz
-    theta1 = np.radians(theta1)
-    theta2, thetas1, thetas2, p = snell(vp1, vp2, vs1, vs2, theta1)
+    out = zoeppritz_coefficients(vp1, vs1, rho1, vp2, vs2, rho2, theta1,
+                                 method=method, postcritical=postcritical)
 
-    Rpp = np.zeros(np.shape(theta1))
-    Rps = np.zeros(np.shape(theta1))
-    Tpp = np.zeros(np.shape(theta1))
-    Tps = np.zeros(np.shape(theta1))
-
-    for n in np.arange(0, len(theta1)):
-
-        M = np.array([
-            [-np.sin(theta1[n]), -np.cos(thetas1[n]),
-             np.sin(theta2[n]), np.cos(thetas2[n])],
-            [np.cos(theta1[n]), -np.sin(thetas1[n]),
-             np.cos(theta2[n]), -np.sin(thetas2[n])],
-            [2.*rho1*vs1*np.sin(thetas1[n])*np.cos(theta1[n]),
-             rho2*vs1*(1.-2.*np.sin(thetas2[n])**2),
-             2.*rho2*vs2*np.sin(thetas2[n])*np.cos(theta2[n]),
-             rho2*vs2*(1.-2.*np.sin(thetas2[n])**2)],
-            [-rho1*vp1*(1.-2.*np.sin(thetas1[n])**2),
-             rho1*vs1*np.sin(2.*thetas1[n]),
-             rho2*vp2*(1.-2.*np.sin(thetas2[n])**2),
-             -rho2*vs2*np.sin(2.*thetas2[n])]])
-
-        N = np.array([
-            [np.sin(theta1[n]), np.cos(thetas1[n]),
-             -np.sin(theta2[n]), -np.cos(thetas2[n])],
-            [np.cos(theta1[n]), -np.sin(thetas1[n]),
-             np.cos(theta2[n]), -np.sin(thetas2[n])],
-            [2.*rho1*vs1*np.sin(thetas1[n])*np.cos(theta1[n]),
-             rho2*vs1*(1.-2.*np.sin(thetas2[n])**2),
-             2.*rho2*vs2*np.sin(thetas2[n])*np.cos(theta2[n]),
-             rho2*vs2*(1.-2.*np.sin(thetas2[n])**2)],
-            [rho1*vp1*(1.-2.*np.sin(thetas1[n])**2),
-             -rho1*vs1*np.sin(2.*thetas1[n]),
-             -rho2*vp2*(1.-2.*np.sin(thetas2[n])**2),
-             rho2*vs2*np.sin(2.*thetas2[n])]])
-
-        Z = np.dot(np.linalg.inv(M), N)
-
-        Rpp[n] = Z[0][0]
-        Rps[n] = Z[1][0]
-        Tpp[n] = Z[2][0]
-        Tps[n] = Z[3][0]
+    return(out['Rpp'])
 
-    return(Rpp)
+
+def zoeppritz_coefficients(vp1, vs1, rho1, vp2, vs2, rho2, theta1,
+                           method='matrix', full=False,
+                           postcritical=False):
+    """
+    Calculate the reflected and transmitted P and S coefficients for a P wave
+    incident from the upper layer, all from a single Zoeppritz solve.
+
+    Returns a dictionary with keys 'Rpp', 'Rps', 'Tpp' and 'Tps'. If full is
+    True, the complete scattering matrix is also returned under the key 'Z',
+    with shape (..., 4, 4). Its columns are the incident down-going P and S
+    waves in the upper layer followed by the up-going P and S waves in the
+    lower layer, and its rows are the scattered up-going P and S waves in the
+    upper layer followed by the down-going P and S waves in the lower layer
+    (Aki and Richards [1980], eq. 5.40).
+
+    :param vp1: Compressional velocity of upper layer.
+    :param vs1: Shear velocity of upper layer.
+    :param rho1: Density of upper layer.
+    :param vp2: Compressional velocity of lower layer.
+    :param vs2: Shear velocity of lower layer.
+    :param rho2: Density of lower layer.
+    :param theta1: Angle of incidence for P wave in upper layer.
+    :param method: Formulation to evaluate, matrix or scattering (see
+                   zoeppritz).
+    :param full: Also return the full 4x4 scattering matrix.
+    :param postcritical: Solve the matrix formulation in complex arithmetic
+                         (the scattering formulation is always complex).
+    """
+    if method == 'matrix':
+        M, N = zoeppritz_matrices(vp1, vs1, rho1, vp2, vs2, rho2, theta1,
+                                  postcritical=postcritical)
+
+        # Only the incident P column of N is needed unless the full
+        # scattering matrix was asked for.
+        if full:
+            Z = np.linalg.solve(M, N)
+        else:
+            Z = np.linalg.solve(M, N[..., :1])
+
+        Rpp, Rps, Tpp, Tps = (Z[..., 0, 0], Z[..., 1, 0],
+                              Z[..., 2, 0], Z[..., 3, 0])
+    elif method == 'scattering':
+        p = np.sin(np.radians(theta1))/vp1
+        if full:
+            Z = scattering_matrix(vp1, vs1, rho1, vp2, vs2, rho2, p)
+            Rpp, Rps, Tpp, Tps = (Z[..., 0, 0], Z[..., 1, 0],
+                                  Z[..., 2, 0], Z[..., 3, 0])
+        else:
+            Rpp, Rps, Tpp, Tps = scattering_coefficients(vp1, vs1, rho1,
+                                                         vp2, vs2, rho2, p)
+    else:
+        raise ValueError('You must specify either matrix or scattering.')
+
+    out = {'Rpp': Rpp, 'Rps': Rps, 'Tpp': Tpp, 'Tps': Tps}
+    if full:
+        out['Z'] = Z
+
+    return(out)
+
+
+def _scattering_terms(vp1, vs1, rho1, vp2, vs2, rho2, p):
+    """
+    Intermediate quantities shared by the Aki and Richards [1980, eq. 5.39]
+    closed-form scattering coefficients.
+    """
+    p = np.asarray(p, dtype=complex)
+
+    # Vertical slownesses, i.e. cos(i)/v, for each of the four waves.
+    ci1 = vertical_slowness(vp1, p)
+    ci2 = vertical_slowness(vp2, p)
+    cj1 = vertical_slowness(vs1, p)
+    cj2 = vertical_slowness(vs2, p)
+
+    a = rho2*(1 - 2*vs2**2*p**2) - rho1*(1 - 2*vs1**2*p**2)
+    b = rho2*(1 - 2*vs2**2*p**2) + 2*rho1*vs1**2*p**2
+    c = rho1*(1 - 2*vs1**2*p**2) + 2*rho2*vs2**2*p**2
+    d = 2*(rho2*vs2**2 - rho1*vs1**2)
+
+    E = b*ci1 + c*ci2
+    F = b*cj1 + c*cj2
+    G = a - d*ci1*cj2
+    H = a - d*ci2*cj1
+    D = E*F + G*H*p**2
+
+    return(p, ci1, ci2, cj1, cj2, a, b, c, d, E, F, G, H, D)
+
+
+def scattering_coefficients(vp1, vs1, rho1, vp2, vs2, rho2, p):
+    """
+    Closed-form Zoeppritz coefficients for a P-wave incident from the upper
+    layer, following the explicit solutions of Aki and Richards [1980,
+    eq. 5.39]. Everything is elementwise complex arithmetic on the ray
+    parameter, so inputs of any broadcastable shape are handled at once.
+
+    Vertical slownesses past a critical angle are taken on the positive
+    imaginary branch (evanescent away from the interface for the
+    exp(-iwt) time convention of Aki and Richards).
+
+    Returns (Rpp, Rps, Tpp, Tps) as complex arrays.
+
+    :param vp1: Compressional velocity of upper layer.
+    :param vs1: Shear velocity of upper layer.
+    :param rho1: Density of upper layer.
+    :param vp2: Compressional velocity of lower layer.
+    :param vs2: Shear velocity of lower layer.
+    :param rho2: Density of lower layer.
+    :param p: Ray parameter (horizontal slowness) of the incident P wave.
+    """
+    (p, ci1, ci2, cj1, cj2,
+     a, b, c, d, E, F, G, H, D) = _scattering_terms(vp1, vs1, rho1,
+                                                    vp2, vs2, rho2, p)
+
+    Rpp = ((b*ci1 - c*ci2)*F - (a + d*ci1*cj2)*H*p**2) / D
+    Rps = -2*ci1*(a*b + c*d*ci2*cj2)*p*vp1 / (vs1*D)
+    Tpp = 2*rho1*ci1*F*vp1 / (vp2*D)
+    Tps = 2*rho1*ci1*H*p*vp1 / (vs2*D)
+
+    return(Rpp, Rps, Tpp, Tps)
+
+
+def scattering_matrix(vp1, vs1, rho1, vp2, vs2, rho2, p):
+    """
+    Closed-form 4x4 scattering matrix of a welded interface between two
+    isotropic layers for P and S waves incident from either side
+    (Aki and Richards [1980], eqs. 5.39 and 5.40). The layout is that of
+    zoeppritz_coefficients, with shape (..., 4, 4).
+
+    :param vp1: Compressional velocity of upper layer.
+    :param vs1: Shear velocity of upper layer.
+    :param rho1: Density of upper layer.
+    :param vp2: Compressional velocity of lower layer.
+    :param vs2: Shear velocity of lower layer.
+    :param rho2: Density of lower layer.
+    :param p: Ray parameter (horizontal slowness).
+    """
+    (p, ci1, ci2, cj1, cj2,
+     a, b, c, d, E, F, G, H, D) = _scattering_terms(vp1, vs1, rho1,
+                                                    vp2, vs2, rho2, p)
+
+    Z = np.empty(np.shape(D) + (4, 4), dtype=complex)
+
+    # P wave incident from above
+    Z[..., 0, 0] = ((b*ci1 - c*ci2)*F - (a + d*ci1*cj2)*H*p**2) / D
+    Z[..., 1, 0] = -2*ci1*(a*b + c*d*ci2*cj2)*p*vp1 / (vs1*D)
+    Z[..., 2, 0] = 2*rho1*ci1*F*vp1 / (vp2*D)
+    Z[..., 3, 0] = 2*rho1*ci1*H*p*vp1 / (vs2*D)
+
+    # S wave incident from above
+    Z[..., 0, 1] = -2*cj1*(a*b + c*d*ci2*cj2)*p*vs1 / (vp1*D)
+    Z[..., 1, 1] = -((b*cj1 - c*cj2)*E - (a + d*ci2*cj1)*G*p**2) / D
+    Z[..., 2, 1] = -2*rho1*cj1*G*p*vs1 / (vp2*D)
+    Z[..., 3, 1] = 2*rho1*cj1*E*vs1 / (vs2*D)
+
+    # P wave incident from below
+    Z[..., 0, 2] = 2*rho2*ci2*F*vp2 / (vp1*D)
+    Z[..., 1, 2] = -2*rho2*ci2*G*p*vp2 / (vs1*D)
+    Z[..., 2, 2] = -((b*ci1 - c*ci2)*F + (a + d*ci2*cj1)*G*p**2) / D
+    Z[..., 3, 2] = 2*ci2*(a*c + b*d*ci1*cj1)*p*vp2 / (vs2*D)
+
+    # S wave incident from below
+    Z[..., 0, 3] = 2*rho2*cj2*H*p*vs2 / (vp1*D)
+    Z[..., 1, 3] = 2*rho2*cj2*E*vs2 / (vs1*D)
+    Z[..., 2, 3] = 2*cj2*(a*c + b*d*ci1*cj1)*p*vs2 / (vp2*D)
+    Z[..., 3, 3] = ((b*cj1 - c*cj2)*E + (a + d*ci1*cj2)*H*p**2) / D
+
+    return(Z)
+
+
+def zoeppritz_matrices(vp1, vs1, rho1, vp2, vs2, rho2, theta1,
+                       postcritical=False):
+    """
+    Build the stacked Aki-Richards [1980, eq. 5.38] Zoeppritz matrices M and
+    N, with shape (..., 4, 4), for every broadcast combination of the inputs.
+    The scattering matrix of the interface is the solution Z of M Z = N.
+
+    The matrices are built directly from the ray parameter p: the sine of
+    each angle is p*v and its cosine v times the vertical slowness. With
+    postcritical=True they are complex, using vertical_slowness, and remain
+    valid past the critical angles.
+
+    :param vp1: Compressional velocity of upper layer.
+    :param vs1: Shear velocity of upper layer.
+    :param rho1: Density of upper layer.
+    :param vp2: Compressional velocity of lower layer.
+    :param vs2: Shear velocity of lower layer.
+    :param rho2: Density of lower layer.
+    :param theta1: Angle of incidence for P wave in upper layer.
+    :param postcritical: Build complex matrices valid past critical.
+    """
+    vp1, vs1, rho1, vp2, vs2, rho2, theta1 = np.broadcast_arrays(
+        *[np.asarray(x, dtype=float)
+          for x in (vp1, vs1, rho1, vp2, vs2, rho2, theta1)])
+
+    theta1 = np.radians(theta1)
+    p = np.sin(theta1)/vp1
+
+    si1 = p*vp1
+    si2 = p*vp2
+    sj1 = p*vs1
+    sj2 = p*vs2
+    if postcritical:
+        ci1 = vp1*vertical_slowness(vp1, p)
+        ci2 = vp2*vertical_slowness(vp2, p)
+        cj1 = vs1*vertical_slowness(vs1, p)
+        cj2 = vs2*vertical_slowness(vs2, p)
+        dtype = complex
+    else:
+        ci1 = np.cos(theta1)
+        ci2 = np.sqrt(1 - si2**2)
+        cj1 = np.sqrt(1 - sj1**2)
+        cj2 = np.sqrt(1 - sj2**2)
+        dtype = float
+
+    M = np.empty(np.shape(theta1) + (4, 4), dtype=dtype)
+    M[..., 0, 0] = -si1
+    M[..., 0, 1] = -cj1
+    M[..., 0, 2] = si2
+    M[..., 0, 3] = cj2
+    M[..., 1, 0] = ci1
+    M[..., 1, 1] = -sj1
+    M[..., 1, 2] = ci2
+    M[..., 1, 3] = -sj2
+    M[..., 2, 0] = 2.*rho1*vs1*sj1*ci1
+    M[..., 2, 1] = rho1*vs1*(1.-2.*sj1**2)
+    M[..., 2, 2] = 2.*rho2*vs2*sj2*ci2
+    M[..., 2, 3] = rho2*vs2*(1.-2.*sj2**2)
+    M[..., 3, 0] = -rho1*vp1*(1.-2.*sj1**2)
+    M[..., 3, 1] = rho1*vs1*2.*sj1*cj1
+    M[..., 3, 2] = rho2*vp2*(1.-2.*sj2**2)
+    M[..., 3, 3] = -rho2*vs2*2.*sj2*cj2
+
+    # N differs from M only in the sign of the rows that depend on the
+    # vertical direction of the incident waves.
+    N = M * np.array([-1., 1., 1., -1.])[:, None]
+
+    return(M, N)
 
 
 def bortfeld(vp1, vs1, rho1, vp2, vs2, rho2, theta1):
@@ -176,35 +383,59 @@ def bortfeld(vp1, vs1, rho1, vp2, vs2, rho2, theta1):
     return Rpp
 
 
-def snell(vp1, vp2, vs1, vs2, theta1):
+def snell(vp1, vp2, vs1, vs2, theta1, postcritical=False):
     """
     Calculates the angles of and refraction and reflection for an incident
     P-wave in a two-layered system.
 
+    With postcritical=True the angles are complex, with sines p*v and
+    cosines v*vertical_slowness(v, p), so that waves past a critical angle
+    are evanescent rather than NaN.
+
     :param vp1: Compressional velocity of upper layer.
     :param vp2: Compressional velocity of lower layer.
     :param vs1: Shear velocity of upper layer.
     :param vs2: Shear velocity of lower layer.
     :param theta1: Angle of incidence of P-wave in upper layer
+    :param postcritical: Return complex angles valid past critical.
     """
-    theta_crit_1 = np.arcsin(vp1/vp2)
-    theta_crit_2 = np.arcsin(vp1/vs2)
+    p = np.sin(theta1)/vp1        # Ray parameter
 
-    p = np.full(np.shape(theta1), None)
-    theta2 = np.full(np.shape(theta1), None)
-    thetas1 = np.full(np.shape(theta1), None)
-    thetas2 = np.full(np.shape(theta1), None)
+    if postcritical:
+        theta2 = _complex_angle(vp2, p)
+        thetas1 = _complex_angle(vs1, p)
+        thetas2 = _complex_angle(vs2, p)
+    else:
+        thetas1 = np.arcsin(p*vs1)    # S-wave reflection
+        theta2 = np.arcsin(p*vp2)     # P refraction
+        thetas2 = np.arcsin(p*vs2)    # S refraction
 
-    p = np.sin(theta1)/vp1        # Ray parameter
-    thetas1 = np.arcsin(p*vs1)    # S-wave reflection
+    return(theta2, thetas1, thetas2, p)
 
-    # P refraction below first critical angle
-    theta2 = np.arcsin(p*vp2)
 
-    # S refraction below second critical angle
-    thetas2 = np.arcsin(p*vs2)
+def vertical_slowness(v, p):
+    """
+    Complex vertical slowness sqrt(1/v^2 - p^2) of a wave with velocity v
+    and ray parameter (horizontal slowness) p. Past the critical ray
+    parameter the root is taken on the positive imaginary branch, so the
+    wave decays away from the interface for the exp(-iwt) time convention
+    of Aki and Richards [1980].
+    """
+    p = np.asarray(p)
+    if np.iscomplexobj(p):
+        q = np.sqrt(1/np.asarray(v, dtype=complex)**2 - p**2)
+        return(np.where(q.imag < 0, -q, q))
 
-    return(theta2, thetas1, thetas2, p)
+    # Real arguments carry a +0 imaginary part, which selects the
+    # positive imaginary root directly.
+    return(np.sqrt((1/np.asarray(v, dtype=float)**2 - p**2) + 0j))
+
+
+def _complex_angle(v, p):
+    """
+    Complex angle with sine p*v and cosine v*vertical_slowness(v, p).
+    """
+    return(-1j*np.log(v*vertical_slowness(v, p) + 1j*p*v))
 
 
 def thomsen(C, p):
@@ -239,21 +470,29 @@ def thomsen(C, p):
            the symmetry axis).
     """
 
-    e2 = (C[0][0] - C[2][2]) / (2*C[2][2])
-    y2 = (C[5][5] - C[3][3]) / (2*C[3][3])
-    d2 = (((C[0][2] + C[4][4])**2 - (C[2][2] - C[4][4])**2) /
-          (2*C[2][2]*(C[2][2] - C[4][4])))
+    C = np.asarray(C)
+    c11 = C[..., 0, 0]
+    c22 = C[..., 1, 1]
+    c33 = C[..., 2, 2]
+    c44 = C[..., 3, 3]
+    c55 = C[..., 4, 4]
+    c66 = C[..., 5, 5]
+    c12 = C[..., 0, 1]
+    c13 = C[..., 0, 2]
+    c23 = C[..., 1, 2]
 
-    e1 = (C[1][1] - C[2][2]) / (2*C[2][2])
-    y1 = (C[5][5] - C[4][4]) / (2*C[4][4])
-    d1 = (((C[1][2] + C[3][3])**2 - (C[2][2] - C[3][3])**2) /
-          (2*C[2][2]*(C[2][2] - C[3][3])))
+    e2 = (c11 - c33) / (2*c33)
+    y2 = (c66 - c44) / (2*c44)
+    d2 = ((c13 + c55)**2 - (c33 - c55)**2) / (2*c33*(c33 - c55))
 
-    d3 = (((C[0][1] + C[5][5])**2 - (C[0][0] - C[5][5])**2) /
-          (2*C[0][0]*(C[0][0] - C[5][5])))
+    e1 = (c22 - c33) / (2*c33)
+    y1 = (c66 - c55) / (2*c55)
+    d1 = ((c23 + c44)**2 - (c33 - c44)**2) / (2*c33*(c33 - c44))
 
-    vp = np.sqrt(C[2][2]/p)
-    vs = np.sqrt(C[4][4]/p)
+    d3 = ((c12 + c66)**2 - (c11 - c66)**2) / (2*c11*(c11 - c66))
+
+    vp = np.sqrt(c33/p)
+    vs = np.sqrt(c55/p)
 
     return(vp, vs, e1, d1, y1, e2, d2, y2, d3)
 
@@ -264,25 +503,31 @@ def Cij(Vp, Vs, p, e1, d1, y1, e2, d2, y2, d3):
     characterize transversely isotropic materials, using the Thomsen parameters
     and elastic parameters.
     """
-    C = np.zeros(shape=(6, 6))
+    shape = np.broadcast(Vp, Vs, p, e1, d1, y1, e2, d2, y2, d3).shape
+    C = np.zeros(shape=shape + (6, 6))
 
     # On-diagonal components
-    C[2][2] = p*Vp**2
-    C[4][4] = p*Vs**2
-    C[0][0] = C[2][2]*(2*e2 + 1)
-    C[1][1] = C[2][2]*(2*e1 + 1)
-    C[5][5] = C[4][4]*(2*y1 + 1)
-    C[3][3] = C[5][5]*(2*y2 + 1)
+    C[..., 2, 2] = p*Vp**2
+    C[..., 4, 4] = p*Vs**2
+    C[..., 0, 0] = C[..., 2, 2]*(2*e2 + 1)
+    C[..., 1, 1] = C[..., 2, 2]*(2*e1 + 1)
+    C[..., 5, 5] = C[..., 4, 4]*(2*y1 + 1)
+    C[..., 3, 3] = C[..., 5, 5]*(2*y2 + 1)
 
     # Off-diagonal
-    C[0][2] = np.sqrt((C[2][2] - C[4][4])**2 + 2*C[2][2]*(C[2][2] - C[4][4])*d2) - C[4][4]
-    C[1][2] = np.sqrt((C[2][2] - C[3][3])**2 + 2*C[2][2]*(C[2][2] - C[3][3])*d1) - C[3][3]
-    C[0][1] = np.sqrt((C[0][0] - C[5][5])**2 + 2*C[0][0]*(C[0][0] - C[5][5])*d3) - C[5][5]
+    c11 = C[..., 0, 0]
+    c33 = C[..., 2, 2]
+    c44 = C[..., 3, 3]
+    c55 = C[..., 4, 4]
+    c66 = C[..., 5, 5]
+    C[..., 0, 2] = np.sqrt((c33 - c55)**2 + 2*c33*(c33 - c55)*d2) - c55
+    C[..., 1, 2] = np.sqrt((c33 - c44)**2 + 2*c33*(c33 - c44)*d1) - c44
+    C[..., 0, 1] = np.sqrt((c11 - c66)**2 + 2*c11*(c11 - c66)*d3) - c66
 
     # Exploit symmetry to fill out matrix
-    C[2][0] = C[0][2]
-    C[2][1] = C[1][2]
-    C[1][0] = C[0][1]
+    C[..., 2, 0] = C[..., 0, 2]
+    C[..., 2, 1] = C[..., 1, 2]
+    C[..., 1, 0] = C[..., 0, 1]
 
     return(C)
 
@@ -294,41 +539,21 @@ def ruger_vti(Vp1, Vs1, p1, e1, d1,
     vertically transverse isotropy using the equations of Thomsen (1992) and
     Ruger (1997).
     """
-    theta1 = np.radians(theta1)
-    theta2, thetas1, thetas2, p = snell(Vp1, Vp2, Vs1, Vs2, theta1)
-    theta = (theta1 + theta2)/2
-    theta = theta1
+    theta = np.radians(theta1)
 
-    u1 = p1*Vs1**2
-    u2 = p2*Vs2**2
-    Z1 = p1*Vp1
-    Z2 = p2*Vp2
-
-    a = (Vp1 + Vp2)/2
-    B = (Vs1 + Vs2)/2
-    Z = (Z1 + Z2)/2
-    u = (u1 + u2)/2
-
-    dZ = Z2 - Z1
-    da = Vp2 - Vp1
-    du = u2 - u1
-    dd = d2 - d1
-    de = e2 - e1
-
-    Rpp_iso = ((1/2)*(dZ/Z) +
-               (1/2)*(da/a - (2*B/a)**2*(du/u))*np.sin(theta)**2 +
-               (1/2)*(da/a)*np.sin(theta)**2*np.tan(theta)**2)
-
-    Rpp_an = (dd/2)*np.sin(theta)**2 + (de/2)*np.sin(theta)**2*np.tan(theta)**2
+    terms = ruger_vti_terms(Vp1, Vs1, p1, e1, d1, Vp2, Vs2, p2, e2, d2)
+    A = terms[..., 0]
+    B = terms[..., 1]
+    C = terms[..., 2]
 
-    Rpp = Rpp_iso + Rpp_an
+    Rpp = A + B*np.sin(theta)**2 + C*np.sin(theta)**2*np.tan(theta)**2
 
     return(Rpp)
 
 
 def daley_hron_vti(V1, V2, V3, V4, p1, p2, theta1,
                    C1_11, C1_13, C1_33, C1_55,
-                   C2_11, C2_13, C2_33, C2_55):
+                   C2_11, C2_13, C2_33, C2_55, postcritical=False):
     """
     Returns the exact reflectivity coefficients for a VTI medium computed using
     the relations of Daley and Hron (1977).
@@ -340,22 +565,33 @@ def daley_hron_vti(V1, V2, V3, V4, p1, p2, theta1,
     :param p1: Density of upper medium.
     :param p2: Density of lower medium.
     :param theta1: Incidence angle of incident P-wave in upper medium.
+    :param postcritical: Evaluate in complex arithmetic, with the vertical
+                         slownesses of vertical_slowness, so that angles
+                         past critical return the phase-shifted coefficient.
     """
 
     # TODO: There's gotta be a better way to implement these equation than
     #       transcribing them from the 1977 paper. This is insane.
     theta1 = np.radians(theta1)
-    theta2, theta3, theta4, p = snell(V1, V2, V3, V4, theta1)
+    theta2, theta3, theta4, p = snell(V1, V2, V3, V4, theta1,
+                                      postcritical=postcritical)
 
     x = np.sin(theta1)
     n = V1/V2
     k1 = V3/V1
     k2 = V4/V2
 
-    P = np.sqrt(1 - x**2)
-    Q = np.sqrt(1 - k1**2*x**2)
-    S = np.sqrt(1 - x**2/n**2)
-    R = np.sqrt(1 - k2**2*x**2/n**2)
+    if postcritical:
+        theta1 = theta1 + 0j
+        P = V1*vertical_slowness(V1, p)
+        Q = V3*vertical_slowness(V3, p)
+        S = V2*vertical_slowness(V2, p)
+        R = V4*vertical_slowness(V4, p)
+    else:
+        P = np.sqrt(1 - x**2)
+        Q = np.sqrt(1 - k1**2*x**2)
+        S = np.sqrt(1 - x**2/n**2)
+        R = np.sqrt(1 - k2**2*x**2/n**2)
 
     # Upper medium parameters
     A1_11 = C1_11 / p1
@@ -444,12 +680,226 @@ def ruger_hti(Vp1, Vs1, p1, ev1, dv1, y1,
     angle and azimuth for an anisotropic material with horizontal transverse
     isotropy using the Ruger [1996] approximation.
     """
-    theta1 = np.radians(theta1)
+    theta = np.radians(theta1)
     phi = np.radians(phi)
 
-    theta2, thetas1, thetas2, p = snell(Vp1, Vp2, Vs1, Vs2, theta1)
-    theta = (theta1 + theta2)/2.0
-    theta = theta1
+    terms = ruger_hti_terms(Vp1, Vs1, p1, ev1, dv1, y1,
+                            Vp2, Vs2, p2, ev2, dv2, y2)
+
+    A = terms[..., 0]
+    B = terms[..., 1] + terms[..., 2]*(np.cos(phi)**2.)
+    C = (terms[..., 3] +
+         terms[..., 4]*(np.cos(phi)**4.) +
+         terms[..., 5]*(np.sin(phi)**2.)*(np.cos(phi)**2.))
+
+    Rpp = A + B*np.sin(theta)**2 + C*np.sin(theta)**2*np.tan(theta)**2
+
+    return(Rpp)
+
+
+def interfaces(log):
+    """
+    Split a log sampled down a well into the properties above and below each
+    interface between adjacent samples. Both halves are returned as column
+    vectors, shape (n_samples - 1, 1), so that they broadcast against a row
+    of incidence angles.
+
+    :param log: 1D array of a layer property (e.g. Vp, Vs or density).
+    """
+    log = np.asarray(log, dtype=float)
+    return(log[:-1, None], log[1:, None])
+
+
+def interface_avo(vp, vs, rho, theta1, method='shuey',
+                  e=None, d=None, y=None, phi=0):
+    """
+    Compute the PP reflectivity of every interface in a set of well logs for
+    every incidence angle in a single vectorized call. The contrasts are taken
+    between adjacent log samples, and the result has shape
+    (n_samples - 1, n_angles).
+
+    method = 'shuey' - Shuey three-term approximation (default)
+    method = 'aki_richards' - Aki-Richards approximation
+    method = 'bortfeld' - Bortfeld approximation
+    method = 'zoeppritz' - Exact Zoeppritz equations
+    method = 'ruger_vti' - Ruger VTI approximation, uses e and d
+    method = 'ruger_hti' - Ruger HTI approximation, uses e, d, y and phi
+
+    :param vp: Compressional velocity log.
+    :param vs: Shear velocity log.
+    :param rho: Density log.
+    :param theta1: Angles of incidence for the P wave, shared by every
+                   interface, or one row per interface (e.g. from
+                   offset.offset_to_angle).
+    :param method: Reflectivity model to evaluate.
+    :param e: Thomsen epsilon log (zero if not given).
+    :param d: Thomsen delta log (zero if not given).
+    :param y: Thomsen gamma log (zero if not given).
+    :param phi: Azimuth, scalar or one value per incidence angle (HTI only).
+    """
+    vp1, vp2 = interfaces(vp)
+    vs1, vs2 = interfaces(vs)
+    rho1, rho2 = interfaces(rho)
+    theta1 = np.asarray(theta1, dtype=float)
+    if theta1.ndim < 2:
+        theta1 = np.atleast_1d(theta1)[None, :]
+
+    if method in ('ruger_vti', 'ruger_hti'):
+        zero = np.zeros(np.shape(vp))
+        e1, e2 = interfaces(zero if e is None else e)
+        d1, d2 = interfaces(zero if d is None else d)
+        y1, y2 = interfaces(zero if y is None else y)
+
+    if method == 'shuey':
+        Rpp = shuey(vp1, vs1, rho1, vp2, vs2, rho2, theta1)
+    elif method == 'aki_richards':
+        Rpp = aki_richards(vp1, vs1, rho1, vp2, vs2, rho2, theta1)
+    elif method == 'bortfeld':
+        Rpp = bortfeld(vp1, vs1, rho1, vp2, vs2, rho2, theta1)
+    elif method == 'zoeppritz':
+        Rpp = zoeppritz(vp1, vs1, rho1, vp2, vs2, rho2, theta1)
+    elif method == 'ruger_vti':
+        Rpp = ruger_vti(vp1, vs1, rho1, e1, d1,
+                        vp2, vs2, rho2, e2, d2, theta1)
+    elif method == 'ruger_hti':
+        phi = np.broadcast_to(phi, np.shape(theta1))
+        Rpp = ruger_hti(vp1, vs1, rho1, e1, d1, y1,
+                        vp2, vs2, rho2, e2, d2, y2, theta1, phi)
+    else:
+        raise ValueError("Unknown reflectivity method '%s'." % method)
+
+    return(Rpp)
+
+
+def interface_coefficients(vp, vs, rho, p, method='zoeppritz'):
+    """
+    Compute the PP and PS reflection coefficients of every interface in a
+    layered model directly in the ray-parameter (horizontal slowness) domain.
+    The ray parameter is conserved across flat interfaces, so no per-layer
+    conversion to incidence angle is needed; a single row of slownesses is
+    evaluated down the whole model at once.
+
+    Returns a dictionary with keys 'Rpp' and 'Rps', each with shape
+    (n_samples - 1, n_p).
+
+    method = 'zoeppritz' - Exact closed-form scattering coefficients of Aki
+                           and Richards [1980]. Complex, and valid past the
+                           critical slownesses.
+    method = 'aki_richards' - Linearized Aki-Richards coefficients, using
+                              the average properties of each interface.
+
+    :param vp: Compressional velocity log.
+    :param vs: Shear velocity log.
+    :param rho: Density log.
+    :param p: Ray parameters, 1D, or one row per interface.
+    :param method: Reflectivity model to evaluate.
+    """
+    vp1, vp2 = interfaces(vp)
+    vs1, vs2 = interfaces(vs)
+    rho1, rho2 = interfaces(rho)
+    p = np.asarray(p, dtype=float)
+    if p.ndim < 2:
+        p = np.atleast_1d(p)[None, :]
+
+    if method == 'zoeppritz':
+        Rpp, Rps, Tpp, Tps = scattering_coefficients(vp1, vs1, rho1,
+                                                     vp2, vs2, rho2, p)
+    elif method == 'aki_richards':
+        vp = (vp1 + vp2) / 2.
+        vs = (vs1 + vs2) / 2.
+        rho = (rho1 + rho2) / 2.
+        dvp = (vp2 - vp1) / vp
+        dvs = (vs2 - vs1) / vs
+        drho = (rho2 - rho1) / rho
+
+        # Direction cosines of the average P and S rays
+        ci = np.sqrt(1 - p**2*vp**2)
+        cj = np.sqrt(1 - p**2*vs**2)
+        k = vs**2*p**2
+        cc = 2*vs*ci*cj/vp
+
+        Rpp = 0.5*(1 - 4*k)*drho + dvp/(2*ci**2) - 4*k*dvs
+        Rps = (-p*vp/(2*cj) *
+               ((1 - 2*k + cc)*drho - (4*k - 2*cc)*dvs))
+    else:
+        raise ValueError("Unknown reflectivity method '%s'." % method)
+
+    return({'Rpp': Rpp, 'Rps': Rps})
+
+
+def shuey_terms(vp1, vs1, rho1, vp2, vs2, rho2):
+    """
+    Compute the intercept (A), gradient (B) and curvature (C) of the Shuey
+    approximation, Rpp = A + B sin^2 + C (tan^2 - sin^2), for any number of
+    interfaces at once. The three terms are stacked along the last axis,
+    shape (..., 3), and can be resynthesized at any set of angles with
+    AngleBasis.synthesize, which takes the angles as incidence angles (see
+    AngleBasis.shuey_incidence).
+
+    :param vp1: Compressional velocity of upper layer.
+    :param vs1: Shear velocity of upper layer.
+    :param rho1: Density of upper layer.
+    :param vp2: Compressional velocity of lower layer.
+    :param vs2: Shear velocity of lower layer.
+    :param rho2: Density of lower layer.
+    """
+    dvp = vp2 - vp1
+    drho = rho2 - rho1
+    dvs = vs2 - vs1
+    rho = (rho1 + rho2) / 2.
+    vs = (vs1 + vs2) / 2.
+    vp = (vp1 + vp2) / 2.
+
+    A = 0.5*(dvp/vp + drho/rho)
+    B = 0.5*dvp/vp - 2*vs**2/vp**2*(drho/rho + 2*dvs/vs)
+    C = 0.5*dvp/vp
+
+    return(np.stack(np.broadcast_arrays(A, B, C), axis=-1))
+
+
+def ruger_vti_terms(Vp1, Vs1, p1, e1, d1, Vp2, Vs2, p2, e2, d2):
+    """
+    Compute the intercept (A), gradient (B) and curvature (C) of the Ruger
+    VTI approximation, Rpp = A + B sin^2 + C sin^2 tan^2. The anisotropic
+    contributions (delta and epsilon contrasts) are folded into B and C.
+    The terms are stacked along the last axis, shape (..., 3).
+    """
+    u1 = p1*Vs1**2
+    u2 = p2*Vs2**2
+    Z1 = p1*Vp1
+    Z2 = p2*Vp2
+
+    a = (Vp1 + Vp2)/2
+    vs = (Vs1 + Vs2)/2
+    Z = (Z1 + Z2)/2
+    u = (u1 + u2)/2
+
+    dZ = Z2 - Z1
+    da = Vp2 - Vp1
+    du = u2 - u1
+    dd = d2 - d1
+    de = e2 - e1
+
+    A = (1/2)*(dZ/Z)
+    B = (1/2)*(da/a - (2*vs/a)**2*(du/u)) + dd/2
+    C = (1/2)*(da/a) + de/2
+
+    return(np.stack(np.broadcast_arrays(A, B, C), axis=-1))
+
+
+def ruger_hti_terms(Vp1, Vs1, p1, ev1, dv1, y1,
+                    Vp2, Vs2, p2, ev2, dv2, y2):
+    """
+    Compute the azimuth-independent coefficients of the Ruger HTI
+    approximation,
+
+    Rpp = A + (Biso + Bani cos^2 phi) sin^2
+            + (Ciso + Ce cos^4 phi + Cd sin^2 phi cos^2 phi) sin^2 tan^2,
+
+    stacked along the last axis in the order (A, Biso, Bani, Ciso, Ce, Cd),
+    shape (..., 6). A is the intercept, Biso and Bani the isotropic and
+    anisotropic gradients, and Ciso, Ce and Cd the curvature terms.
+    """
     u1 = p1*(Vs1**2)
     u2 = p2*(Vs2**2)
     Z1 = p1*Vp1
@@ -468,18 +918,157 @@ def ruger_hti(Vp1, Vs1, p1, ev1, dv1, y1,
     dy = y2 - y1
 
     A = (1./2.)*(dZ/Z)
+    Biso = (1./2.)*((da/a) - ((2.*B/a)**2.)*(du/u))
+    Bani = (1./2.)*(ddv + 2.*((2.*B/a)**2.)*dy)
+    Ciso = (1./2.)*(da/a)
+    Ce = (1./2.)*dev
+    Cd = (1./2.)*ddv
 
-    B = ((1./2.)*((da/a) -
-         ((2.*B/a)**2.)*(du/u) +
-         (ddv + 2.*((2.*B/a)**2.)*dy)*(np.cos(phi)**2.)))
+    return(np.stack(np.broadcast_arrays(A, Biso, Bani, Ciso, Ce, Cd),
+                    axis=-1))
 
-    C = ((1./2.)*((da/a) +
-         dev*(np.cos(phi)**4.) +
-         ddv*(np.sin(phi)**2.)*(np.cos(phi)**2.)))
 
-    Rpp = A + B*np.sin(theta)**2 + C*np.sin(theta)**2*np.tan(theta)**2
+def vavrycuk_psencik_hti_terms(vp1, vs1, p1, d1, e1, y1,
+                               vp2, vs2, p2, d2, e2, y2):
+    """
+    Compute the azimuth-independent coefficients of vavrycuk_psencik_hti,
 
-    return(Rpp)
+    Rpp = A + (Biso + Bd cos^2 phi + By 2 sin phi) sin^2
+            + (Ciso + Ce cos^4 phi + Cd sin^2 phi cos^2 phi) sin^2 tan^2,
+
+    stacked along the last axis in the order (A, Biso, Bd, Ciso, Ce, Cd,
+    By), shape (..., 7). The tan^2 term of the isotropic part is split
+    into its sin^2 and sin^2 tan^2 parts.
+    """
+    G1 = p1*(vs1**2)
+    G2 = p2*(vs2**2)
+    Z1 = p1*vp1
+    Z2 = p2*vp2
+
+    a = (vp1 + vp2)/2
+    B = (vs1 + vs2)/2
+    Z = (Z1 + Z2)/2
+    G = (G1 + G2)/2
+
+    dZ = Z2 - Z1
+    da = vp2 - vp1
+    dG = G2 - G1
+    dd = d2 - d1
+    de = e2 - e1
+    dy = y2 - y1
+
+    A = 1/2*(dZ/Z)
+    Biso = 1/2*(da/a) - 2*((B/a)**2)*(dG/G)
+    Bd = 1/2*dd
+    Ciso = 1/2*(da/a)
+    Ce = 1/2*de
+    Cd = 1/2*dd
+    By = -4*((B/a)**2)*dy
+
+    return(np.stack(np.broadcast_arrays(A, Biso, Bd, Ciso, Ce, Cd, By),
+                    axis=-1))
+
+
+class AngleBasis(object):
+    """Precomputed trigonometric basis for the linear AVO approximations.
+
+    Surveys are usually processed on a fixed set of incidence angles (and
+    azimuths), so the sin^2 and sin^2 tan^2 terms are evaluated once here.
+    Every approximation is then the product of per-interface coefficients
+    with this basis, i.e. one matrix multiplication per gather.
+
+    The basis is evaluated at the incidence angle, so ruger_vti, ruger_hti
+    and vavrycuk_psencik_hti are reproduced exactly. The function shuey
+    uses the mean of the incidence and transmission angles, which varies
+    from interface to interface and cannot be precomputed; the method
+    shuey_incidence here evaluates the same terms at the incidence angle,
+    as is usual when working with intercept and gradient, and differs from
+    shuey by up to about 0.01 at moderate angles.
+
+    Constructor
+    -----------
+    AngleBasis(theta, phi=0)
+
+    theta : array_like
+        Incidence angles in degrees.
+    phi : array_like
+        Azimuths in degrees, broadcast against theta.
+
+    Attributes
+    ----------
+    shape : tuple
+        Broadcast shape of theta and phi.
+    isotropic : numpy 2D array, shape (n_angles, 3)
+        Columns 1, sin^2, sin^2 tan^2.
+    hti : numpy 2D array, shape (n_angles, 6)
+        Columns 1, sin^2, sin^2 cos^2(phi), sin^2 tan^2,
+        sin^2 tan^2 cos^4(phi), sin^2 tan^2 sin^2(phi) cos^2(phi).
+    vavrycuk : numpy 2D array, shape (n_angles, 7)
+        Columns of hti, followed by 2 sin^2 sin(phi).
+    """
+    def __init__(self, theta, phi=0):
+        theta, phi = np.broadcast_arrays(np.radians(np.asarray(theta, float)),
+                                         np.radians(np.asarray(phi, float)))
+        self.shape = theta.shape
+        theta = theta.ravel()
+        phi = phi.ravel()
+
+        sin2 = np.sin(theta)**2
+        sin2tan2 = sin2*np.tan(theta)**2
+        cos2phi = np.cos(phi)**2
+        sin2phi = np.sin(phi)**2
+
+        self.isotropic = np.column_stack([np.ones_like(sin2), sin2,
+                                          sin2tan2])
+        self.hti = np.column_stack([np.ones_like(sin2), sin2,
+                                    sin2*cos2phi, sin2tan2,
+                                    sin2tan2*cos2phi**2,
+                                    sin2tan2*sin2phi*cos2phi])
+        self.vavrycuk = np.column_stack([self.hti,
+                                         sin2*np.sin(phi)*2])
+
+    def synthesize(self, terms):
+        """Return Rpp, shape terms.shape[:-1] + self.shape, for stacked
+        coefficients with 3 (isotropic/VTI), 6 (Ruger HTI) or 7 (Vavrycuk
+        and Psencik HTI) terms on the last axis."""
+        terms = np.asarray(terms)
+        k = terms.shape[-1]
+        if k == 3:
+            basis = self.isotropic
+        elif k == 6:
+            basis = self.hti
+        elif k == 7:
+            basis = self.vavrycuk
+        else:
+            raise ValueError('Expected 3, 6 or 7 coefficients, got %d.' % k)
+
+        Rpp = np.dot(terms.reshape(-1, k), basis.T)
+
+        return(Rpp.reshape(terms.shape[:-1] + self.shape))
+
+    def shuey_incidence(self, vp1, vs1, rho1, vp2, vs2, rho2):
+        """Shuey approximation at the incidence angle rather than the mean
+        angle of shuey."""
+        return(self.synthesize(shuey_terms(vp1, vs1, rho1,
+                                           vp2, vs2, rho2)))
+
+    def ruger_vti(self, Vp1, Vs1, p1, e1, d1, Vp2, Vs2, p2, e2, d2):
+        """Ruger VTI approximation on this basis (see ruger_vti)."""
+        return(self.synthesize(ruger_vti_terms(Vp1, Vs1, p1, e1, d1,
+                                               Vp2, Vs2, p2, e2, d2)))
+
+    def ruger_hti(self, Vp1, Vs1, p1, ev1, dv1, y1,
+                  Vp2, Vs2, p2, ev2, dv2, y2):
+        """Ruger HTI approximation on this basis (see ruger_hti)."""
+        return(self.synthesize(ruger_hti_terms(Vp1, Vs1, p1, ev1, dv1, y1,
+                                               Vp2, Vs2, p2, ev2, dv2, y2)))
+
+    def vavrycuk_psencik_hti(self, vp1, vs1, p1, d1, e1, y1,
+                             vp2, vs2, p2, d2, e2, y2):
+        """Vavrycuk and Psencik HTI approximation on this basis (see
+        vavrycuk_psencik_hti)."""
+        return(self.synthesize(vavrycuk_psencik_hti_terms(
+            vp1, vs1, p1, d1, e1, y1, vp2, vs2, p2, d2, e2, y2)))
 
 
 def elastic_impedance(Vp, Vs, p, theta):
@@ -513,247 +1102,286 @@ def exact_ortho(C1, p1, C2, p2, chi1, chi2, phi, theta):
     """
     Calculate the exact Zoeppritz equations for an HTI medium using the
     Schoenberg and Protazio [1992] formulation.
-    """
 
+    All arguments are broadcast against each other, with C1 and C2 taken as
+    stacks of 6x6 stiffness matrices, shape (..., 6, 6). A full fan of
+    azimuths and incidence angles, over any number of interfaces, is thus
+    evaluated in one call, and Rpp is returned with the broadcast shape.
+    """
+    C1 = np.asarray(C1, dtype=float)
+    C2 = np.asarray(C2, dtype=float)
+    p1 = np.asarray(p1, dtype=float)
+    p2 = np.asarray(p2, dtype=float)
     phi = np.radians(phi)
     theta = np.radians(theta)
     chi1 = np.radians(chi1)
     chi2 = np.radians(chi2)
 
-    # Black magic begins here...
-    # Adding a very small percentage of whitening to the input matrices seems
-    # to stabilize the solution???
-    norm1 = np.linalg.norm(C1)
-    norm2 = np.linalg.norm(C2)
-    C1 = C1 + 0.00001*norm1*np.random.rand(6, 6)
-    C2 = C2 + 0.00001*norm2*np.random.rand(6, 6)
-    # End black magic
+    shape = np.broadcast(C1[..., 0, 0], C2[..., 0, 0], p1, p2,
+                         chi1, chi2, phi, theta).shape
+
+    # Only the symmetric part of the stiffness matrices is physical; taking
+    # it explicitly keeps every Christoffel matrix below exactly symmetric.
+    C1 = 0.5*(C1 + np.swapaxes(C1, -1, -2))
+    C2 = 0.5*(C2 + np.swapaxes(C2, -1, -2))
 
-    # Construct rotation matrices to properly align the
+    # Rotate stiffness matrices to properly align the
     # HTI porion of the orthorhombic anisotropy.
-    schi = np.sin(chi1)
-    cchi = np.cos(chi1)
-    G1 = [[cchi**2, schi**2, 0, 0, 0, 2*cchi*schi],
-          [schi**2, cchi**2, 0, 0, 0, -2*schi*cchi],
-          [0, 0, 1, 0, 0, 0],
-          [0, 0, 0, cchi, -schi, 0],
-          [0, 0, 0, schi, cchi,  0],
-          [-cchi*schi, cchi*schi, 0, 0, 0, cchi**2 - schi**2]]
-    G1 = np.asarray(G1)
-
-    schi = np.sin(chi2)
-    cchi = np.cos(chi2)
-    G2 = np.zeros(shape=(6, 6))
-    G2 = [[cchi**2, schi**2, 0, 0, 0, 2*cchi*schi],
-          [schi**2, cchi**2, 0, 0, 0, 2*schi*cchi],
-          [0, 0, 1, 0, 0, 0],
-          [0, 0, 0, cchi, -schi, 0],
-          [0, 0, 0, schi, cchi,  0],
-          [-cchi*schi, cchi*schi, 0, 0, 0, cchi**2 - schi**2]]
-    G2 = np.asarray(G2)
-
-    # Rotate stiffness matrices
-    C1 = G1.dot(C1).dot(G1.T)
-    C2 = G2.dot(C2).dot(G2.T)
+    G1 = _bond_z(chi1)
+    G2 = _bond_z(chi2)
+    C1 = np.matmul(np.matmul(G1, C1), np.swapaxes(G1, -1, -2))
+    C2 = np.matmul(np.matmul(G2, C2), np.swapaxes(G2, -1, -2))
+
+    p1 = np.broadcast_to(p1, shape)
+    p2 = np.broadcast_to(p2, shape)
 
     ########################################
     # SLOWNESS VECTOR OF THE INCIDENT WAVE
     ########################################
 
-    # Construct Christoffel matrices in the velocity form as the first step
-    # towards determining the phase velocity and phase polarization vectors
-    # in the direction of propagation
-    # (that is, the slowness vector of the incident phase).
-
     # Propagation vector (directional, no velocity information)
-    n = np.array([np.cos(phi)*np.sin(theta),
-                  np.sin(phi)*np.sin(theta),
-                  np.cos(theta)])
-
-    # Construct Christoffel matrix
-    L = christoffel(C1, n)
-    # Compute eigenvectors and eigenvalues of Christoffel matrix.
-    w, v = np.linalg.eig(L/p1)
-    # quasi-P velocity of the upper medium, in the direction of propagation.
-    vp1 = np.sqrt(np.max(w))
+    n = np.stack(np.broadcast_arrays(np.cos(phi)*np.sin(theta),
+                                     np.sin(phi)*np.sin(theta),
+                                     np.cos(theta)), axis=-1)
+    n = np.broadcast_to(n, shape + (3,))
+
+    # The largest eigenvalue of the Christoffel matrix in the direction of
+    # propagation is the quasi-P phase velocity of the upper medium.
+    w = np.linalg.eigvalsh(christoffel(C1, n) / p1[..., None, None])
+    vp1 = np.sqrt(w[..., -1])
     # Slowness vector using derived quasi-P velocity.
-    s = n / vp1
-
-    ########################################
-    # SLOWNESS VECTORS OF REFLECTED WAVES
-    ########################################
-
-    # Compute the coefficients of the bicubic equation from the stiffness
-    # matrix of the upper layer, density, and the two horizontal components
-    # of slowness.
-    A, B, C, D = monoclinic_bicubic_coeffs(s[0], s[1], p1, C1)
-    # Input the computed coefficients and solve the bicubic polynomial
-    z = np.sort(np.roots(np.array([A, B, C, D])))
-    s1P = np.array([s[0], s[1], np.sqrt(np.abs(z[0]))])
-    s1S = np.array([s[0], s[1], np.sqrt(np.abs(z[1]))])
-    s1T = np.array([s[0], s[1], np.sqrt(np.abs(z[2]))])
+    s = n / vp1[..., None]
 
     ########################################
-    # SLOWNESS VECTORS OF TRANSMITTED WAVES
+    # SLOWNESS AND POLARIZATION VECTORS
     ########################################
 
-    # Compute the coefficients of the bicubic equation from the stiffness
-    # matrix of the upper layer, density, and the two horizontal components
-    # of slowness.
-    A, B, C, D = monoclinic_bicubic_coeffs(s[0], s[1], p2, C2)
-    # Input the computed coefficients and solve the bicubic polynomial
-    z = np.sort(np.roots(np.array([A, B, C, D])))
-    s2P = np.array([s[0], s[1], np.sqrt(np.abs(z[0]))])
-    s2S = np.array([s[0], s[1], np.sqrt(np.abs(z[1]))])
-    s2T = np.array([s[0], s[1], np.sqrt(np.abs(z[2]))])
+    # Reflected waves in the upper medium, transmitted in the lower.
+    s1, ev1 = _ortho_phases(C1, p1, s[..., 0], s[..., 1], n)
+    s2, ev2 = _ortho_phases(C2, p2, s[..., 0], s[..., 1], n)
 
-    ########################################
-    # POLARIZATION VECTORS OF REFLECTED WAVES
-    ########################################
-
-    # Construct the Christoffel matrices for the three upper phases,
-    # and compute the eigensystem of the matrices.
-
-    # #### REFLECTED QUASI-P PHASE
-    CM1P = christoffel(C1, s1P)
-    w, v = np.linalg.eig(CM1P)
-    ev1P = v[:, 0]
-
-    # #### REFLECTED QUASI-S PHASE
-    CM1S = christoffel(C1, s1S)
-    w, v = np.linalg.eig(CM1S)
-    ev1S = v[:, 1]
+    # Construct X, Y, X', and Y' impedance matrices
+    X1, Y1 = _impedance_matrices(C1, s1, ev1)
+    X2, Y2 = _impedance_matrices(C2, s2, ev2)
 
-    # #### REFLECTED QUASI-T PHASE
-    CM1T = christoffel(C1, s1T)
-    w, v = np.linalg.eig(CM1T)
-    ev1T = -v[:, 2]
+    # Solve the X, Y, X', Y' system of equations for
+    # the Zoeppritz reflection matrix R. The traction rows are in units of
+    # impedance and the displacement rows are dimensionless, so both media
+    # are scaled by the same row weights before solving; X1^-1 X2 and
+    # Y1^-1 Y2 are unchanged by a common row scaling, but the systems are
+    # far better conditioned.
+    Z = np.sqrt(p1*C1[..., 2, 2])
+    one = np.ones(shape)
+    wx = np.stack([one, one, 1/Z], axis=-1)[..., None]
+    wy = np.stack([1/Z, 1/Z, one], axis=-1)[..., None]
+    X = np.linalg.solve(wx*X1, wx*X2)
+    Y = np.linalg.solve(wy*Y1, wy*Y2)
+    R = np.swapaxes(np.linalg.solve(np.swapaxes(X + Y, -1, -2),
+                                    np.swapaxes(X - Y, -1, -2)), -1, -2)
+
+    return(R[..., 0, 0])
+
+
+def _bond_z(chi):
+    """
+    Bond transformation matrix, shape (..., 6, 6), rotating a Voigt
+    stiffness matrix about the vertical axis by chi radians.
+    """
+    schi = np.sin(chi)
+    cchi = np.cos(chi)
+
+    G = np.zeros(np.shape(chi) + (6, 6))
+    G[..., 0, 0] = cchi**2
+    G[..., 0, 1] = schi**2
+    G[..., 0, 5] = 2*cchi*schi
+    G[..., 1, 0] = schi**2
+    G[..., 1, 1] = cchi**2
+    G[..., 1, 5] = -2*schi*cchi
+    G[..., 2, 2] = 1
+    G[..., 3, 3] = cchi
+    G[..., 3, 4] = -schi
+    G[..., 4, 3] = schi
+    G[..., 4, 4] = cchi
+    G[..., 5, 0] = -cchi*schi
+    G[..., 5, 1] = cchi*schi
+    G[..., 5, 5] = cchi**2 - schi**2
+
+    return(G)
+
+
+def cubic_roots(A, B, C, D, polish=1):
+    """
+    Roots of stacks of cubic polynomials A z^3 + B z^2 + C z + D = 0, such as
+    the output of monoclinic_bicubic_coeffs, in closed form.
+
+    The trigonometric solution is used where all three roots are real and
+    Cardano's formula where there is one real root and a complex pair; each
+    root is then refined by `polish` Newton steps on the original cubic.
+    All coefficients are broadcast against each other and the roots are
+    returned as a complex array of shape (..., 3), sorted by real part.
+
+    For the bicubic in the squared vertical slowness z = s3^2 the sorted
+    roots belong, in order, to the qP, qS1 and qS2 waves: the fastest wave
+    has the smallest vertical slowness, and evanescent (post-critical)
+    waves have the most negative z.
+    """
+    A, B, C, D = np.broadcast_arrays(*[np.asarray(x, dtype=float)
+                                       for x in (A, B, C, D)])
+    b = B/A
+    c = C/A
+    d = D/A
+
+    # Depressed cubic t^3 + P t + Q = 0 with z = t - b/3
+    P = c - b**2/3
+    Q = 2*b**3/27 - b*c/3 + d
+    disc = (Q/2)**2 + (P/3)**3
+    real = disc <= 0
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Three real roots (trigonometric solution)
+        m = 2*np.sqrt(np.maximum(-P/3, 0))
+        arg = np.clip(np.where(P < 0, 3*Q/(P*m), 0), -1, 1)
+        ang = np.arccos(arg)/3
+        k = np.arange(3)
+        z = m[..., None]*np.cos(ang[..., None] - 2*np.pi*k/3) - b[..., None]/3
+    z = np.sort(_polish_cubic(z, b, c, d, polish), axis=-1)
+    z = z.astype(complex)
+
+    # One real root and a complex conjugate pair (Cardano), solved only
+    # where needed. The sign choice avoids cancellation between the two
+    # cube roots.
+    if not real.all():
+        b = b[~real]
+        c = c[~real]
+        d = d[~real]
+        P = P[~real]
+        Q = Q[~real]
+        u = np.where(Q < 0, 1, -1)*np.cbrt(np.abs(Q)/2 + np.sqrt(disc[~real]))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            v = np.where(u != 0, -P/(3*u), 0)
+        zc = np.stack([u + v,
+                       -(u + v)/2 + 0.5j*np.sqrt(3)*(u - v),
+                       -(u + v)/2 - 0.5j*np.sqrt(3)*(u - v)], axis=-1)
+        zc = _polish_cubic(zc - b[..., None]/3, b, c, d, polish)
+        z[~real] = np.sort(zc, axis=-1)
+
+    return(z)
+
+
+def _polish_cubic(z, b, c, d, n):
+    """
+    n Newton steps on the roots z, shape (..., 3), of the monic cubic
+    z^3 + b z^2 + c z + d. A step is only taken where it reduces the
+    residual: at a double root both f and f' are round-off, and their ratio
+    can throw an already accurate root far away.
+    """
+    b = b[..., None]
+    c = c[..., None]
+    d = d[..., None]
+    f = ((z + b)*z + c)*z + d
+    for _ in range(n):
+        df = (3*z + 2*b)*z + c
+        nonzero = df != 0
+        zn = z - np.where(nonzero, f, 0)/np.where(nonzero, df, 1)
+        fn = ((zn + b)*zn + c)*zn + d
+        better = np.abs(fn) < np.abs(f)
+        z = np.where(better, zn, z)
+        f = np.where(better, fn, f)
+
+    return(z)
+
+
+def _ortho_phases(C, p, sx, sy, n):
+    """
+    Slowness and polarization vectors of the quasi-P, quasi-S and quasi-T
+    waves sharing the horizontal slowness (sx, sy), each shape (..., 3, 3)
+    with one column per phase.
+    """
+    # Input the coefficients of the bicubic equation and solve for the
+    # squared vertical slownesses, fastest (quasi-P) first.
+    z = cubic_roots(*monoclinic_bicubic_coeffs(sx, sy, p, C))
+    s3 = np.sqrt(np.abs(z))
+
+    # Where the two shear roots coincide (isotropic layers, or a shear-wave
+    # singularity) the root finder only resolves them to about the square
+    # root of machine precision, and separate eigen-decompositions at the
+    # two slightly different slownesses give shear polarizations that need
+    # not be orthogonal. Snap both to a common vertical slowness so that
+    # they come out of one and the same symmetric eigen-decomposition.
+    degenerate = np.abs(s3[..., 1] - s3[..., 2]) <= 1e-6*s3[..., 1]
+    s3[..., 1:] = np.where(degenerate[..., None],
+                           0.5*(s3[..., 1] + s3[..., 2])[..., None],
+                           s3[..., 1:])
+    sx = np.broadcast_to(sx[..., None], np.shape(s3))
+    sy = np.broadcast_to(sy[..., None], np.shape(s3))
+    s = np.stack([sx, sy, s3], axis=-2)
+
+    # The Christoffel matrix of each phase has the density as an eigenvalue;
+    # in ascending order it is the largest for quasi-P, the middle one for
+    # the faster quasi-S and the smallest for the slower quasi-T.
+    ev = np.empty(np.shape(s))
+    for m, k in enumerate([2, 1, 0]):
+        w, v = np.linalg.eigh(christoffel(C, s[..., m]))
+        ev[..., m] = v[..., k]
+    ev[..., 2] = -ev[..., 2]
 
     # Match up quasi-SV and quasi-SH with the proper eigenvalues/eigenvectors
-    if np.sum(ev1T*n) > np.sum(ev1S*n):
-        print('swapping upper shears')
-        foo = s1S
-        s1S = s1T
-        s1T = foo
-
-        foo = ev1S
-        ev1S = ev1T
-        ev1T = foo
-
-    ########################################
-    # POLARIZATION VECTORS OF TRANSMITTED WAVES
-    ########################################
+    swap = np.sum(ev[..., 2]*n, axis=-1) > np.sum(ev[..., 1]*n, axis=-1)
+    s[swap] = s[swap][..., [0, 2, 1]]
+    ev[swap] = ev[swap][..., [0, 2, 1]]
 
-    # #### LOWER LAYER P PHASE
-    CM2P = christoffel(C2, s2P)
-    w, v = np.linalg.eig(CM2P)
-    ev2P = v[:, 0]
+    return(s, ev)
 
-    # #### LOWER LAYER S PHASE
-    CM2S = christoffel(C2, s2S)
-    w, v = np.linalg.eig(CM2S)
-    ev2S = v[:, 1]
 
-    # #### LOWER LAYER T PHASE
-    CM2T = christoffel(C2, s2T)
-    w, v = np.linalg.eig(CM2T)
-    ev2T = -v[:, 2]
-
-    # Match up quasi-SV and quasi-SH with the proper eigenvalues/eigenvectors
-    if np.sum(ev2T*n) > np.sum(ev2S*n):
-        print('swapping lower shears')
-        foo = s2S
-        s2S = s2T
-        s2T = foo
+def _impedance_matrices(C, s, ev):
+    """
+    Schoenberg and Protazio [1992] displacement (X) and traction (Y)
+    impedance matrices, shape (..., 3, 3), for the phases with slowness s
+    and polarization ev (one phase per column).
+    """
+    C = C[..., None, :, :]
+    s0 = s[..., 0, :]
+    s1 = s[..., 1, :]
+    s2 = s[..., 2, :]
+    e0 = ev[..., 0, :]
+    e1 = ev[..., 1, :]
+    e2 = ev[..., 2, :]
 
-        foo = ev2S
-        ev2S = ev2T
-        ev2T = foo
+    X = np.stack([e0, e1,
+                  (-(C[..., 0, 2]*e0 + C[..., 2, 5]*e1)*s0 -
+                   (C[..., 1, 2]*e1 + C[..., 2, 5]*e0)*s1 -
+                   C[..., 2, 2]*e2*s2)], axis=-2)
 
-    # Construct X, Y, X', and Y' impedance matrices
-    # #### UPPER MEDIUM
-    X1 = np.zeros(shape=(3, 3))
-    X1[0][0] = ev1P[0]
-    X1[0][1] = ev1S[0]
-    X1[0][2] = ev1T[0]
-    X1[1][0] = ev1P[1]
-    X1[1][1] = ev1S[1]
-    X1[1][2] = ev1T[1]
-    X1[2][0] = -(C1[0][2]*ev1P[0] + C1[2][5]*ev1P[1])*s1P[0] - (C1[1][2]*ev1P[1] + C1[2][5]*ev1P[0])*s1P[1] - C1[2][2]*ev1P[2]*s1P[2]
-    X1[2][1] = -(C1[0][2]*ev1S[0] + C1[2][5]*ev1S[1])*s1S[0] - (C1[1][2]*ev1S[1] + C1[2][5]*ev1S[0])*s1S[1] - C1[2][2]*ev1S[2]*s1S[2]
-    X1[2][2] = -(C1[0][2]*ev1T[0] + C1[2][5]*ev1S[1])*s1T[0] - (C1[1][2]*ev1T[1] + C1[2][5]*ev1T[0])*s1T[1] - C1[2][2]*ev1T[2]*s1T[2]
-
-    Y1 = np.zeros(shape=(3, 3))
-    Y1[0][0] = (-(C1[4][4]*s1P[0] + C1[3][4]*s1P[1])*ev1P[2] -
-                 (C1[4][4]*ev1P[0] + C1[3][4]*ev1P[1])*s1P[2])
-    Y1[0][1] = (-(C1[4][4]*s1S[0] + C1[3][4]*s1S[1])*ev1S[2] -
-                 (C1[4][4]*ev1S[0] + C1[3][4]*ev1S[1])*s1S[2])
-    Y1[0][2] = (-(C1[4][4]*s1T[0] + C1[3][4]*s1T[1])*ev1T[2] -
-                 (C1[4][4]*ev1T[0] + C1[3][4]*ev1T[1])*s1T[2])
-    Y1[1][0] = (-(C1[3][4]*s1P[0] + C1[3][3]*s1P[1])*ev1P[2] -
-                 (C1[3][4]*ev1P[0] + C1[3][3]*ev1P[1])*s1P[2])
-    Y1[1][1] = (-(C1[3][4]*s1S[0] + C1[3][3]*s1S[1])*ev1S[2] -
-                 (C1[3][4]*ev1S[0] + C1[3][3]*ev1S[1])*s1S[2])
-    Y1[1][2] = (-(C1[3][4]*s1T[0] + C1[3][3]*s1T[1])*ev1T[2] -
-                 (C1[3][4]*ev1T[0] + C1[3][3]*ev1T[1])*s1T[2])
-    Y1[2][0] = ev1P[2]
-    Y1[2][1] = ev1S[2]
-    Y1[2][2] = ev1T[2]
-
-    # ### LOWER MEDIUM
-    X2 = np.zeros(shape=(3, 3))
-    X2[0][0] = ev2P[0]
-    X2[0][1] = ev2S[0]
-    X2[0][2] = ev2T[0]
-    X2[1][0] = ev2P[1]
-    X2[1][1] = ev2S[1]
-    X2[1][2] = ev2T[1]
-    X2[2][0] = -(C2[0][2]*ev2P[0] + C2[2][5]*ev2P[1])*s2P[0] - (C2[1][2]*ev2P[1] + C2[2][5]*ev2P[0])*s2P[1] - C2[2][2]*ev2P[2]*s2P[2]
-    X2[2][1] = -(C2[0][2]*ev2S[0] + C2[2][5]*ev2S[1])*s2S[0] - (C2[1][2]*ev2S[1] + C2[2][5]*ev2S[0])*s2S[1] - C2[2][2]*ev2S[2]*s2S[2]
-    X2[2][2] = -(C2[0][2]*ev2T[0] + C2[2][5]*ev2S[1])*s2T[0] - (C2[1][2]*ev2T[1] + C2[2][5]*ev2T[0])*s2T[1] - C2[2][2]*ev2T[2]*s2T[2]
-
-    Y2 = np.zeros(shape=(3, 3))
-    Y2[0][0] = (-(C2[4][4]*s2P[0] +
-                  C2[3][4]*s2P[1])*ev2P[2] -
-                 (C2[4][4]*ev2P[0] +
-                  C2[3][4]*ev2P[1])*s2P[2])
-    Y2[0][1] = (-(C2[4][4]*s2S[0] +
-                  C2[3][4]*s2S[1])*ev2S[2] -
-                 (C2[4][4]*ev2S[0] + C2[3][4]*ev2S[1])*s2S[2])
-    Y2[0][2] = (-(C2[4][4]*s2T[0] + C2[3][4]*s2T[1])*ev2T[2] -
-                 (C2[4][4]*ev2T[0] + C2[3][4]*ev2T[1])*s2T[2])
-    Y2[1][0] = (-(C2[3][4]*s2P[0] + C2[3][3]*s2P[1])*ev2P[2] -
-                 (C2[3][4]*ev2P[0] + C2[3][3]*ev2P[1])*s2P[2])
-    Y2[1][1] = (-(C2[3][4]*s2S[0] + C2[3][3]*s2S[1])*ev2S[2] -
-                 (C2[3][4]*ev2S[0] + C2[3][3]*ev2S[1])*s2S[2])
-    Y2[1][2] = (-(C2[3][4]*s2T[0] + C2[3][3]*s2T[1])*ev2T[2] -
-                 (C2[3][4]*ev2T[0] + C2[3][3]*ev2T[1])*s2T[2])
-    Y2[2][0] = ev2P[2]
-    Y2[2][1] = ev2S[2]
-    Y2[2][2] = ev2T[2]
+    Y = np.stack([(-(C[..., 4, 4]*s0 + C[..., 3, 4]*s1)*e2 -
+                   (C[..., 4, 4]*e0 + C[..., 3, 4]*e1)*s2),
+                  (-(C[..., 3, 4]*s0 + C[..., 3, 3]*s1)*e2 -
+                   (C[..., 3, 4]*e0 + C[..., 3, 3]*e1)*s2),
+                  e2], axis=-2)
 
-    # Solve the X, Y, X', Y' system of equations for
-    # the Zoeppritz reflection matrix R
-    T = np.linalg.inv(np.linalg.inv(X1).dot(X2) + np.linalg.inv(Y1).dot(Y2))
-    R = (np.linalg.inv(X1).dot(X2) - np.linalg.inv(Y1).dot(Y2)).dot(T)
-
-    return(R[0][0])
+    return(X, Y)
 
 
 def monoclinic_bicubic_coeffs(s1, s2, p, C):
-    c11 = C[0][0]
-    c22 = C[1][1]
-    c33 = C[2][2]
-    c44 = C[3][3]
-    c55 = C[4][4]
-    c66 = C[5][5]
-    c12 = C[0][1]
-    c13 = C[0][2]
-    c23 = C[1][2]
-    c16 = C[0][5]
-    c26 = C[1][5]
-    c36 = C[2][5]
-    c45 = C[3][4]
+    """
+    Coefficients of the cubic in the squared vertical slowness, A z^3 + B z^2
+    + C z + D = 0 with z = s3^2, for a monoclinic medium with a horizontal
+    mirror plane and horizontal slowness components s1 and s2. C may be a
+    single 6x6 stiffness matrix or a stack of them, shape (..., 6, 6).
+    """
+    C = np.asarray(C)
+    c11 = C[..., 0, 0]
+    c22 = C[..., 1, 1]
+    c33 = C[..., 2, 2]
+    c44 = C[..., 3, 3]
+    c55 = C[..., 4, 4]
+    c66 = C[..., 5, 5]
+    c12 = C[..., 0, 1]
+    c13 = C[..., 0, 2]
+    c23 = C[..., 1, 2]
+    c16 = C[..., 0, 5]
+    c26 = C[..., 1, 5]
+    c36 = C[..., 2, 5]
+    c45 = C[..., 3, 4]
     A = (c33*c44*c55 - c33*c45**2)
     B = (c11*c33*c44*s1**2 - 2*c12*c33*c45*s1*s2 - c13**2*c44*s1**2 +
          2*c13*c23*c45*s1*s2 - 2*c13*c36*c44*s1*s2 + 2*c13*c36*c45*s1**2 -
@@ -847,36 +1475,39 @@ def monoclinic_bicubic_coeffs(s1, s2, p, C):
 
 
 def christoffel(C, s):
-    CM = np.zeros(shape=(3, 3))
-    CM[0][0] = (C[0][0]*s[0]**2 +
-                C[5][5]*s[1]**2 +
-                C[4][4]*s[2]**2 +
-                2*C[0][5]*s[0]*s[1])
-    CM[0][1] = (C[0][5]*s[0]**2 +
-                C[1][5]*s[1]**2 +
-                C[3][4]*s[2]**2 +
-                (C[0][1]+C[5][5])*s[0]*s[1])
-    CM[0][2] = ((C[0][2]+C[4][4])*s[0]*s[2] +
-                (C[2][5]+C[3][4])*s[1]*s[2])
-    CM[1][0] = (C[0][5]*s[0]**2 +
-                C[1][5]*s[1]**2 +
-                C[3][4]*s[2]**2 +
-                (C[0][1]+C[5][5])*s[0]*s[1])
-    CM[1][1] = (C[5][5]*s[0]**2 +
-                C[1][1]*s[1]**2 +
-                C[3][3]*s[2]**2 +
-                2*C[1][5]*s[0]*s[1])
-    CM[1][2] = ((C[2][5]+C[3][4])*s[0]*s[2] +
-                (C[1][2]+C[3][3])*s[1]*s[2])
-    CM[2][0] = ((C[0][2]+C[4][4])*s[0]*s[2] +
-                (C[2][5]+C[3][4])*s[1]*s[2])
-    CM[2][1] = ((C[2][5]+C[3][4])*s[0]*s[2] +
-                (C[3][3]+C[1][2])*s[1]*s[2])
-    CM[2][2] = (C[4][4]*s[0]**2 +
-                C[3][3]*s[1]**2+C[2][2]*s[2]**2 +
-                2*C[3][4]*s[0]*s[1])
-
-    return(CM)
+    """
+    Christoffel matrix G_ik = c_ijkl s_j s_l of a general (triclinic) medium
+    for slowness (or direction) vector s.
+
+    C, shape (..., 6, 6), is the full Voigt stiffness matrix and s has shape
+    (..., 3); both are broadcast against each other, so an (N, 3) stack of
+    slowness vectors may be paired with a single stiffness matrix or with an
+    (N, 6, 6) stack of them. The result has shape (..., 3, 3).
+    """
+    C = np.asarray(C)
+    L = _voigt_gradient(s)
+
+    return(np.einsum('...ia,...ab,...kb->...ik', L, C, L))
+
+
+def _voigt_gradient(s):
+    """
+    The (..., 3, 6) operator L(s) taking Voigt stresses to tractions on the
+    plane with normal s, such that G = L C L^T is the Christoffel matrix.
+    """
+    s = np.asarray(s, dtype=float)
+    L = np.zeros(np.shape(s)[:-1] + (3, 6))
+    L[..., 0, 0] = s[..., 0]
+    L[..., 0, 4] = s[..., 2]
+    L[..., 0, 5] = s[..., 1]
+    L[..., 1, 1] = s[..., 1]
+    L[..., 1, 3] = s[..., 2]
+    L[..., 1, 5] = s[..., 0]
+    L[..., 2, 2] = s[..., 2]
+    L[..., 2, 3] = s[..., 1]
+    L[..., 2, 4] = s[..., 0]
+
+    return(L)
 
 
 def vavrycuk_psencik_hti(vp1, vs1, p1, d1, e1, y1,
@@ -887,12 +1518,9 @@ def vavrycuk_psencik_hti(vp1, vs1, p1, d1, e1, y1,
     derived by Vavrycuk and Psencik [1998], "PP-wave reflection coefficients
     in weakly anisotropic elastic media"
     """
-    theta1 = np.radians(theta1)
+    theta = np.radians(theta1)
     phi = np.radians(phi)
 
-    theta2, thetas1, thetas2, p = snell(vp1, vp2, vs1, vs2, theta1)
-    theta = (theta1 + theta2)/2
-    theta = theta1
     G1 = p1*(vs1**2)
     G2 = p2*(vs2**2)
     Z1 = p1*vp1
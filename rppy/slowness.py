@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#   rppy - a geophysical library for Python
+#   Copyright (c) 2014, Sean M. Contenti
+#   All rights reserved.
+#
+#   Redistribution and use in source and binary forms, with or without
+#   modification, are permitted provided that the following conditions are met:
+#
+#   1. Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+#
+#   2. Redistributions in binary form must reproduce the above copyright
+#   notice, this list of conditions and the following disclaimer in the
+#   documentation and/or other materials provided with the distribution.
+#
+#   THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+#   "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED
+#   TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#   PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#   CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#   EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#   PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS;
+#   OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+#   WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR
+#   OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF
+#   ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+import numpy as np
+
+from .reflectivity import christoffel, _voigt_gradient
+
+
+def direction(theta, phi=0):
+    """
+    Unit propagation vectors, shape (..., 3), for inclination theta from the
+    vertical and azimuth phi from the x1-axis, both in degrees. theta and
+    phi are broadcast against each other, so a dense direction grid is
+    obtained from e.g. theta[:, None] and phi[None, :].
+    """
+    theta = np.radians(theta)
+    phi = np.radians(phi)
+
+    n = np.stack(np.broadcast_arrays(np.sin(theta)*np.cos(phi),
+                                     np.sin(theta)*np.sin(phi),
+                                     np.cos(theta)), axis=-1)
+
+    return(n)
+
+
+def velocity_surface(C, p, n):
+    """
+    Phase velocities, group velocity vectors and polarizations of the qP,
+    qS1 and qS2 waves of a general anisotropic medium.
+
+    C, shape (..., 6, 6), is the Voigt stiffness matrix, p the density and
+    n, shape (..., 3), the unit wavefront normal. All three are broadcast
+    against each other; thousands of directions over thousands of stiffness
+    matrices are evaluated in one call with C[:, None] and n[None, :].
+
+    Returns a dictionary of contiguous arrays, with the modes ordered qP,
+    qS1, qS2 (fastest to slowest) along axis -2 where present:
+
+    phase — phase velocities, shape (..., 3);
+    slowness — slowness vectors n/v, shape (..., 3, 3);
+    group — group (ray) velocity vectors, shape (..., 3, 3);
+    polarization — unit polarization vectors, shape (..., 3, 3).
+
+    Polarizations are signed so that qP points along n and the largest
+    component of each shear polarization is positive.
+    """
+    C = np.asarray(C, dtype=float)
+    p = np.asarray(p, dtype=float)
+    n = np.asarray(n, dtype=float)
+
+    # The eigenvalues of the density-normalized Christoffel matrix are the
+    # squared phase velocities, and its eigenvectors the polarizations.
+    w, v = np.linalg.eigh(christoffel(C, n) / p[..., None, None])
+    phase = np.sqrt(w[..., ::-1])
+    g = np.swapaxes(v[..., ::-1], -1, -2)
+
+    sign = np.ones(np.shape(phase))
+    sign[..., 0] = np.where(np.sum(g[..., 0, :]*n, axis=-1) < 0, -1, 1)
+    big = np.argmax(np.abs(g[..., 1:, :]), axis=-1)
+    big = g[..., 1:, :][tuple(np.indices(big.shape)) + (big,)]
+    sign[..., 1:] = np.where(big < 0, -1, 1)
+    g = g*sign[..., None]
+
+    # Group velocity V_i = c_ijkl g_j g_k n_l / (p v): contract the Voigt
+    # stress of the plane-wave strain g n with the polarization.
+    L = _voigt_gradient(n)
+    strain = np.einsum('...ia,...mi->...ma', L, g)
+    stress = np.einsum('...ab,...mb->...ma', C, strain)
+    group = np.einsum('...mia,...ma->...mi', _voigt_gradient(g), stress)
+    group = group / (p[..., None, None]*phase[..., None])
+
+    return({'phase': np.ascontiguousarray(phase),
+            'slowness': np.ascontiguousarray(n[..., None, :] /
+                                             phase[..., None]),
+            'group': np.ascontiguousarray(group),
+            'polarization': np.ascontiguousarray(g)})
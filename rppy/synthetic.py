@@ -0,0 +1,264 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#   rppy - a geophysical library for Python
+#   Copyright (c) 2014, Sean M. Contenti
+#   All rights reserved.
+#
+#   Redistribution and use in source and binary forms, with or without
+#   modification, are permitted provided that the following conditions are met:
+#
+#   1. Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+#
+#   2. Redistributions in binary form must reproduce the above copyright
+#   notice, this list of conditions and the following disclaimer in the
+#   documentation and/or other materials provided with the distribution.
+#
+#   THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+#   "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED
+#   TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#   PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#   CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#   EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#   PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS;
+#   OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+#   WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR
+#   OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF
+#   ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+import functools
+import warnings
+
+import numpy as np
+
+from . import util
+from .offset import rms_velocity
+from .reflectivity import interface_avo
+
+
+def depth_to_time(vp, z):
+    """
+    Two-way vertical traveltime to the base of every depth sample of an
+    interval velocity log, with the interval from the datum to the first
+    sample filled with the first velocity.
+
+    :param vp: Interval compressional velocity log.
+    :param z: Depth of each log sample.
+    """
+    t0, vrms = rms_velocity(vp, z)
+
+    return(t0)
+
+
+class WaveletBank(object):
+    """A wavelet, or one wavelet per trace, with cached spectra.
+
+    Convolving many blocks of traces with the same wavelets only needs the
+    wavelet spectra once per transform length, so they are computed on
+    first use and kept here. Transform lengths are rounded up to the next
+    product of powers of two and three, which keeps both the FFTs fast and
+    the number of cached spectra small.
+
+    Constructor
+    -----------
+    WaveletBank(wavelet, spectrum=None)
+
+    wavelet : array_like
+        Wavelet samples along the last axis, centred on the middle sample
+        (as ricker or ormsby on a symmetric time axis). A 2D array of shape
+        (n_traces, n_w) holds one wavelet per trace, e.g. per angle.
+    spectrum : callable, optional
+        Function of the transform length returning the zero-phase spectra
+        of the wavelets, e.g. util.wavelet_spectrum. If given, no forward
+        FFT of the wavelets is ever taken. WaveletBank.analytic builds such
+        a bank for the util wavelets.
+
+    Attributes
+    ----------
+    wavelet : numpy array
+        The wavelets, read-only.
+    shape : tuple
+        Shape of the bank, without the time axis.
+    """
+    def __init__(self, wavelet, spectrum=None):
+        self.wavelet = np.array(wavelet, dtype=float)
+        self.wavelet.flags.writeable = False
+        self.shape = self.wavelet.shape[:-1]
+        self._spectrum = spectrum
+        self._spectra = {}
+
+    @classmethod
+    def analytic(cls, f, dt, n, kind='ricker'):
+        """
+        Bank of a single util wavelet of n samples at sample rate dt, with
+        its spectra evaluated in closed form by util.wavelet_spectrum.
+
+        The closed-form spectra are those of the untruncated wavelet, so
+        they only match the n samples held in self.wavelet when the wavelet
+        has decayed within them (and is not aliased at dt). A
+        RuntimeWarning is raised when the two spectra differ by more than
+        0.1% of the peak, e.g. for a 30 Hz Ricker at 1 ms with fewer than
+        about 71 samples; convolve then follows the closed-form spectrum.
+
+        :param f: Wavelet frequency, or frequencies for ormsby.
+        :param dt: Sample rate, in the reciprocal units of f.
+        :param n: Number of samples.
+        :param kind: Type of wavelet, ricker or ormsby.
+        """
+        def spectrum(nfft):
+            return(util.wavelet_spectrum(f, dt, nfft, kind=kind))
+
+        bank = cls(util.wavelet(f, dt, n, kind=kind), spectrum=spectrum)
+
+        nfft = _fft_length(n)
+        W = bank.spectrum(nfft)
+        err = np.abs(np.fft.rfft(bank.wavelet, nfft) - W).max()
+        if err > 1e-3*np.abs(W).max():
+            warnings.warn('%d samples truncate the %s wavelet; its spectrum '
+                          'differs from the closed form by %.2g%% of the '
+                          'peak.' % (n, kind, 100*err/np.abs(W).max()),
+                          RuntimeWarning)
+
+        return(bank)
+
+    def __len__(self):
+        return(self.wavelet.shape[-1])
+
+    def spectrum(self, nfft):
+        """
+        Real FFT of the wavelets for a transform of length nfft, shape
+        self.shape + (nfft//2 + 1,).
+        """
+        if nfft not in self._spectra:
+            if self._spectrum is None:
+                W = np.fft.rfft(self.wavelet, nfft, axis=-1)
+            else:
+                # Delay the zero-phase spectrum to the middle sample, where
+                # the sampled wavelets are centred.
+                k = np.arange(nfft//2 + 1)
+                W = (self._spectrum(nfft) *
+                     np.exp(-2j*np.pi*k*((len(self) - 1)//2)/nfft))
+            W.flags.writeable = False
+            self._spectra[nfft] = W
+
+        return(self._spectra[nfft])
+
+    def convolve(self, r, axis=-1):
+        """
+        Convolve every trace of r with the wavelets along the given axis,
+        with output aligned with, and the same length as, r. A bank of
+        per-trace wavelets is broadcast against the other axes of r (with
+        the time axis removed), e.g. a bank of shape (n_traces,) against r
+        of shape (n_traces, n_samples).
+
+        :param r: Block of reflectivity traces.
+        :param axis: Time axis of r.
+        """
+        r = np.moveaxis(np.asarray(r), axis, -1)
+        nfft = _fft_length(r.shape[-1] + len(self) - 1)
+
+        R = np.fft.rfft(r, nfft, axis=-1)
+        s = np.fft.irfft(R*self.spectrum(nfft), nfft, axis=-1)
+
+        start = (len(self) - 1)//2
+        return(np.moveaxis(s[..., start:start + r.shape[-1]], -1, axis))
+
+
+def _fft_length(n):
+    """
+    Smallest length of the form 2^a 3^b not less than n.
+    """
+    best = 2**int(np.ceil(np.log2(n)))
+    m = 3
+    while m < best:
+        best = min(best, m*2**int(max(np.ceil(np.log2(n/m)), 0)))
+        m *= 3
+
+    return(best)
+
+
+@functools.lru_cache(maxsize=32)
+def _cached_bank(data, shape):
+    return(WaveletBank(np.frombuffer(data).reshape(shape)))
+
+
+def convolve(r, wavelet, axis=-1):
+    """
+    Convolve every trace of a block of reflectivity series with a wavelet,
+    or with a bank of per-trace wavelets, by batched real FFT along the
+    given axis. With the default axis=-1, as for WaveletBank.convolve, a
+    block of shape (n_traces, n_samples) is convolved at once; use axis=0
+    for an angle gather of shape (n_samples, n_traces). A bank of
+    per-trace wavelets, shape (n_traces, n_w), pairs wavelet n with trace
+    n in either layout.
+
+    The wavelet may be a WaveletBank, whose spectra are reused across
+    calls, or an array of wavelet samples centred on its middle sample. The
+    banks of recently used arrays are cached as well, so the wavelet FFT is
+    computed once per wavelet and transform length.
+
+    :param r: Reflectivity series.
+    :param wavelet: Wavelet samples or a WaveletBank.
+    :param axis: Time axis of r.
+    """
+    if not isinstance(wavelet, WaveletBank):
+        wavelet = np.ascontiguousarray(wavelet, dtype=float)
+        wavelet = _cached_bank(wavelet.tobytes(), wavelet.shape)
+
+    return(wavelet.convolve(r, axis=axis))
+
+
+def synthetic_gather(vp, vs, rho, z, theta, wavelet, dt, method='shuey',
+                     e=None, d=None, y=None, phi=0):
+    """
+    Synthetic angle (or offset) gather of a set of well logs.
+
+    The logs are converted from depth to two-way time with the Vp log, the
+    reflectivity of every interface is computed for every angle with any of
+    the interface_avo models, and the reflection coefficients are summed
+    onto a regular time axis, each split linearly between the two samples
+    either side of its traveltime. All angles are then convolved with the
+    wavelet in a single FFT.
+
+    Coefficients the model cannot evaluate, such as those of zoeppritz
+    beyond a critical angle, are NaN; they are muted (set to zero) so that
+    they do not spread through the FFT to the rest of their trace.
+
+    Returns a dictionary with keys 't' (time axis, shape (n_t,)),
+    'reflectivity' and 'gather' (both shape (n_t, n_traces)).
+
+    :param vp: Compressional velocity log.
+    :param vs: Shear velocity log.
+    :param rho: Density log.
+    :param z: Depth of each log sample.
+    :param theta: Angles of incidence for the P wave, in degrees. Either
+                  one angle per trace, or an angle field with one row per
+                  interface such as offset_to_angle(vp, z, offsets)[:-1]
+                  for an offset gather.
+    :param wavelet: Wavelet sampled at dt, centred on its middle sample,
+                    one such wavelet per trace, or a WaveletBank.
+    :param dt: Sample rate of the gather, in the time units of vp and z.
+    :param method: Reflectivity model to evaluate (see interface_avo).
+    :param e: Thomsen epsilon log (anisotropic models only).
+    :param d: Thomsen delta log (anisotropic models only).
+    :param y: Thomsen gamma log (anisotropic models only).
+    :param phi: Azimuth (ruger_hti only).
+    """
+    t0 = depth_to_time(vp, z)
+    Rpp = interface_avo(vp, vs, rho, theta, method=method,
+                        e=e, d=d, y=y, phi=phi)
+    Rpp = np.where(np.isfinite(Rpp), Rpp, 0)
+
+    # Interface n sits at the base of sample n.
+    t = np.arange(np.floor(t0[0]/dt), np.ceil(t0[-2]/dt) + 2)*dt
+    k = (t0[:-1] - t[0])/dt
+    i = np.floor(k).astype(int)
+    w = (k - i)[:, None]
+
+    r = np.zeros((len(t), Rpp.shape[1]))
+    np.add.at(r, i, (1 - w)*Rpp)
+    np.add.at(r, i + 1, w*Rpp)
+
+    return({'t': t, 'reflectivity': r,
+            'gather': convolve(r, wavelet, axis=0)})
@@ -27,6 +27,8 @@
 #   ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 
+import functools
+
 import numpy as np
 
 
@@ -46,6 +48,18 @@ def tuning_wedge(Rpp, f0, t):
     return A
 
 
+def thickness(z):
+    """
+    Thickness of the interval above each depth sample of a log. The interval
+    from the datum (depth zero) to the first sample is assigned to the first
+    sample.
+
+    :param z: Depth of each log sample.
+    """
+    z = np.asarray(z, dtype=float)
+    return(np.diff(np.concatenate([[0.], z])))
+
+
 def ricker(f, t):
     """
     Calculates a standard zero-phase Ricker (Mexican Hat) wavelet for a given
@@ -74,3 +88,101 @@ def ormsby(t, f1, f2, f3, f4):
          ((np.pi*f2)**2/(np.pi*f2 - np.pi*f1)*np.sinc(np.pi*f2*t)**2 -
           (np.pi*f1)**2/(np.pi*f2 - np.pi*f1)*np.sinc(np.pi*f1*t)**2))
     return(O)
+
+
+def ricker_spectrum(f, freq):
+    """
+    Closed-form amplitude spectrum of the zero-phase Ricker wavelet of
+    ricker(f, t), i.e. its Fourier transform, which is real and even:
+    2 freq^2 / (sqrt(pi) f^3) exp(-freq^2/f^2).
+
+    :param f: Central frequency of Ricker wavelet.
+    :param freq: Frequencies at which to evaluate the spectrum.
+    """
+    freq = np.asarray(freq, dtype=float)
+    R = 2*freq**2/(np.sqrt(np.pi)*f**3)*np.exp(-freq**2/f**2)
+    return(R)
+
+
+def ormsby_spectrum(freq, f1, f2, f3, f4):
+    """
+    Closed-form amplitude spectrum of the zero-phase Ormsby wavelet of
+    ormsby(t, f1, f2, f3, f4), i.e. its Fourier transform: a trapezoid of
+    unit height. As ormsby evaluates np.sinc (already normalized by pi) at
+    pi*f*t, the corners of its trapezoid lie at pi times f1, f2, f3 and f4,
+    and this spectrum matches that.
+
+    :param freq: Frequencies at which to evaluate the spectrum.
+    :param f1: Low-frequency stop-band.
+    :param f2: Low-frequency corner.
+    :param f3: High-frequency corner.
+    :param f4: High-frequency stop-band.
+    """
+    nu = np.abs(np.asarray(freq, dtype=float))/np.pi
+    spec = (np.clip((nu - f1)/(f2 - f1), 0, 1) -
+            np.clip((nu - f3)/(f4 - f3), 0, 1))
+    return(spec)
+
+
+def wavelet(f, dt, n, kind='ricker'):
+    """
+    Sampled zero-phase wavelet of n samples at sample rate dt, centred on
+    sample (n - 1)//2. Wavelets are memoized on (kind, f, dt, n) with LRU
+    eviction, so repeated requests return the same read-only array without
+    re-evaluating it.
+
+    kind = 'ricker' - ricker wavelet, f is the central frequency (default)
+    kind = 'ormsby' - ormsby wavelet, f is the sequence (f1, f2, f3, f4)
+
+    :param f: Wavelet frequency, or frequencies for ormsby.
+    :param dt: Sample rate, in the reciprocal units of f.
+    :param n: Number of samples.
+    :param kind: Type of wavelet, ricker or ormsby.
+    """
+    return(_wavelet(kind, tuple(np.atleast_1d(f).tolist()), float(dt),
+                    int(n)))
+
+
+@functools.lru_cache(maxsize=128)
+def _wavelet(kind, f, dt, n):
+    t = (np.arange(n) - (n - 1)//2)*dt
+    if kind == 'ricker':
+        w = ricker(f[0], t)
+    elif kind == 'ormsby':
+        w = ormsby(t, *f)
+    else:
+        raise ValueError("Unknown wavelet '%s'." % kind)
+
+    w.flags.writeable = False
+    return(w)
+
+
+def wavelet_spectrum(f, dt, nfft, kind='ricker'):
+    """
+    Real FFT, of length nfft, of a wavelet sampled at dt and centred on
+    time zero, evaluated in closed form rather than by transforming the
+    sampled wavelet: the continuous spectrum at the rfft frequencies,
+    divided by dt. The result is real (zero phase) and read-only, and is
+    memoized like wavelet.
+
+    :param f: Wavelet frequency, or frequencies for ormsby.
+    :param dt: Sample rate, in the reciprocal units of f.
+    :param nfft: Transform length.
+    :param kind: Type of wavelet, ricker or ormsby.
+    """
+    return(_wavelet_spectrum(kind, tuple(np.atleast_1d(f).tolist()),
+                             float(dt), int(nfft)))
+
+
+@functools.lru_cache(maxsize=128)
+def _wavelet_spectrum(kind, f, dt, nfft):
+    freq = np.fft.rfftfreq(nfft, dt)
+    if kind == 'ricker':
+        W = ricker_spectrum(f[0], freq)/dt
+    elif kind == 'ormsby':
+        W = ormsby_spectrum(freq, *f)/dt
+    else:
+        raise ValueError("Unknown wavelet '%s'." % kind)
+
+    W.flags.writeable = False
+    return(W)
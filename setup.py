@@ -16,7 +16,7 @@ with open('HISTORY.rst') as history_file:
 
 requirements = [
     # TODO: put package requirements here
-    'numpy',
+    'numpy>=1.11.0',
     'matplotlib'
 ]
 
@@ -34,12 +34,12 @@ theta = np.arange(0, 90, 1)
 loopang = phi
 theta = np.array([30])
 
-rphti = np.zeros(np.shape(loopang))
 rpzoe = np.zeros(np.shape(loopang))
 rprug = np.zeros(np.shape(loopang))
 
+rphti = rppy.reflectivity.exact_ortho(C1, p1, C2, p2, chi1, chi2, loopang, theta)
+
 for aid, val in enumerate(loopang):
-    rphti[aid] = rppy.reflectivity.exact_ortho(C1, p1, C2, p2, chi1, chi2, loopang[aid], theta)
     rprug[aid] = rppy.reflectivity.ruger_hti(vp1, vs1, p1, e2_1, d2_1, y2_1, vp2, vs2, p2, e2_2, d2_2, y2_2, np.radians(theta), np.radians(loopang[aid]))
     rpzoe[aid] = rppy.reflectivity.zoeppritz(vp1, vs1, p1, vp2, vs2, p2, np.radians(theta))
 
@@ -27,8 +27,15 @@
 #   ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 
+import io
+import os
+import shutil
+import tempfile
+import warnings
+
 import rppy
 import numpy as np
+import pytest
 
 # Test reflectivity.py
 
@@ -267,6 +274,304 @@ def test_zoeppritz_against_crewes():
         assert np.abs(val - exp[ind])/exp[ind] < err
 
 
+def test_zoeppritz_batched():
+    vp1 = np.array([3000, 2500, 2800])[:, None]
+    vs1 = np.array([1500, 1200, 1400])[:, None]
+    p1 = np.array([2000, 2100, 2300])[:, None]
+
+    vp2 = np.array([4000, 2700, 2600])[:, None]
+    vs2 = np.array([2000, 1500, 1100])[:, None]
+    p2 = np.array([2200, 2200, 2150])[:, None]
+
+    theta = np.arange(0, 40, 5)
+
+    Rpp = rppy.reflectivity.zoeppritz(vp1, vs1, p1, vp2, vs2, p2, theta)
+
+    assert Rpp.shape == (3, 8)
+    for i in range(3):
+        for j, thetav in enumerate(theta):
+            exp = rppy.reflectivity.zoeppritz(vp1[i, 0], vs1[i, 0], p1[i, 0],
+                                              vp2[i, 0], vs2[i, 0], p2[i, 0],
+                                              thetav)
+            assert np.allclose(Rpp[i, j], exp)
+
+    # Against the explicit Rpp of Aki and Richards [1980], eq. 5.39.
+    p = np.sin(np.radians(theta))/vp1
+    ci1 = np.sqrt(1 - (p*vp1)**2)
+    ci2 = np.sqrt(1 - (p*vp2)**2)
+    cj1 = np.sqrt(1 - (p*vs1)**2)
+    cj2 = np.sqrt(1 - (p*vs2)**2)
+    a = p2*(1 - 2*vs2**2*p**2) - p1*(1 - 2*vs1**2*p**2)
+    b = p2*(1 - 2*vs2**2*p**2) + 2*p1*vs1**2*p**2
+    c = p1*(1 - 2*vs1**2*p**2) + 2*p2*vs2**2*p**2
+    d = 2*(p2*vs2**2 - p1*vs1**2)
+    E = b*ci1/vp1 + c*ci2/vp2
+    F = b*cj1/vs1 + c*cj2/vs2
+    G = a - d*ci1/vp1*cj2/vs2
+    H = a - d*ci2/vp2*cj1/vs1
+    exp = (((b*ci1/vp1 - c*ci2/vp2)*F - (a + d*ci1/vp1*cj2/vs2)*H*p**2) /
+           (E*F + G*H*p**2))
+    assert np.allclose(Rpp, exp, rtol=1e-10)
+
+    # Normal incidence is the impedance contrast.
+    Z1 = p1*vp1
+    Z2 = p2*vp2
+    assert np.allclose(Rpp[:, 0], ((Z2 - Z1)/(Z2 + Z1))[:, 0])
+
+    # The scattered waves carry all of the incident energy flux.
+    R = rppy.reflectivity.zoeppritz_coefficients(vp1, vs1, p1, vp2, vs2, p2,
+                                                 theta)
+    flux = (R['Rpp']**2 + R['Rps']**2*vs1*cj1/(vp1*ci1) +
+            R['Tpp']**2*p2*vp2*ci2/(p1*vp1*ci1) +
+            R['Tps']**2*p2*vs2*cj2/(p1*vp1*ci1))
+    assert np.allclose(flux, 1)
+
+
+def test_zoeppritz_scattering():
+    vp1 = 3000
+    vs1 = 1500
+    p1 = 2000
+
+    vp2 = 4000
+    vs2 = 2000
+    p2 = 2200
+
+    theta = np.arange(0, 48, 2)
+    exp = rppy.reflectivity.zoeppritz(vp1, vs1, p1, vp2, vs2, p2, theta)
+    Rpp = rppy.reflectivity.zoeppritz(vp1, vs1, p1, vp2, vs2, p2, theta,
+                                      method='scattering')
+    assert np.allclose(Rpp, exp)
+
+    # Past the critical angle the coefficient is complex, but finite.
+    theta = np.arange(50, 90, 5)
+    Rpp = rppy.reflectivity.zoeppritz(vp1, vs1, p1, vp2, vs2, p2, theta,
+                                      method='scattering')
+    assert np.all(np.isfinite(Rpp))
+    assert np.all(np.abs(Rpp) <= 1)
+
+
+def test_postcritical():
+    vp1, vs1, rho1 = 3000, 1500, 2000
+    vp2, vs2, rho2 = 4000, 2000, 2200
+    theta = np.arange(0, 90, 1.)
+
+    # The complex matrix solve matches the closed-form coefficients on both
+    # sides of the critical angle, and the real solve before it.
+    Rpp = rppy.reflectivity.zoeppritz(vp1, vs1, rho1, vp2, vs2, rho2, theta,
+                                      postcritical=True)
+    exp = rppy.reflectivity.zoeppritz(vp1, vs1, rho1, vp2, vs2, rho2, theta,
+                                      method='scattering')
+    assert not np.any(np.isnan(Rpp))
+    assert np.allclose(Rpp, exp)
+    pre = theta < np.degrees(np.arcsin(vp1/vp2))
+    real = rppy.reflectivity.zoeppritz(vp1, vs1, rho1, vp2, vs2, rho2,
+                                       theta[pre])
+    assert np.allclose(Rpp[pre], real)
+
+    # Complex angles keep sin = p*v with evanescent (positive imaginary)
+    # cosines past critical.
+    theta2, thetas1, thetas2, p = rppy.reflectivity.snell(
+        vp1, vp2, vs1, vs2, np.radians(theta), postcritical=True)
+    assert np.allclose(np.sin(theta2), p*vp2)
+    assert np.all(np.cos(theta2[~pre]).imag > 0)
+    assert np.allclose(theta2[pre], np.arcsin(p[pre]*vp2))
+
+    # Daley and Hron also evaluates past critical in complex mode.
+    C1 = rppy.reflectivity.Cij(vp1, vs1, rho1, 0.1, 0.05, 0, 0.1, 0.05, 0, 0)
+    C2 = rppy.reflectivity.Cij(vp2, vs2, rho2, 0.1, 0.05, 0, 0.1, 0.05, 0, 0)
+    args = (vp1, vp2, vs1, vs2, rho1, rho2, theta[1:],
+            C1[0, 0], C1[0, 2], C1[2, 2], C1[4, 4],
+            C2[0, 0], C2[0, 2], C2[2, 2], C2[4, 4])
+    Rpp = rppy.reflectivity.daley_hron_vti(*args, postcritical=True)
+    assert not np.any(np.isnan(Rpp))
+    assert np.allclose(Rpp[pre[1:]],
+                       rppy.reflectivity.daley_hron_vti(*args)[pre[1:]])
+
+
+def test_zoeppritz_coefficients():
+    vp1 = 3000
+    vs1 = 1500
+    p1 = 2000
+
+    vp2 = 4000
+    vs2 = 2000
+    p2 = 2200
+
+    theta = np.arange(0, 48, 4)
+
+    mat = rppy.reflectivity.zoeppritz_coefficients(vp1, vs1, p1,
+                                                   vp2, vs2, p2, theta,
+                                                   full=True)
+    sca = rppy.reflectivity.zoeppritz_coefficients(vp1, vs1, p1,
+                                                   vp2, vs2, p2, theta,
+                                                   method='scattering',
+                                                   full=True)
+
+    assert mat['Z'].shape == (len(theta), 4, 4)
+    assert np.allclose(mat['Z'], sca['Z'])
+    for key in ['Rpp', 'Rps', 'Tpp', 'Tps']:
+        assert np.allclose(mat[key], sca[key])
+
+    exp = rppy.reflectivity.zoeppritz(vp1, vs1, p1, vp2, vs2, p2, theta)
+    assert np.allclose(mat['Rpp'], exp)
+
+    # Normal incidence: no conversions, and the impedance contrast formula.
+    Z1 = p1*vp1
+    Z2 = p2*vp2
+    assert np.abs(mat['Rpp'][0] - (Z2 - Z1)/(Z2 + Z1)) < 1e-12
+    assert np.abs(mat['Rps'][0]) < 1e-12
+    assert np.abs(mat['Tpp'][0] - 2*Z1/(Z2 + Z1)) < 1e-12
+
+
+def test_interface_avo():
+    vp = np.array([3000., 4000., 3500., 3800.])
+    vs = np.array([1500., 2000., 1700., 1900.])
+    rho = np.array([2000., 2200., 2100., 2250.])
+    e = np.array([0., 0.1, 0.05, 0.])
+    d = np.array([0., 0.1, 0.02, 0.])
+    y = np.array([0., 0.3, 0.1, 0.])
+    theta = np.array([0., 10., 20., 30.])
+
+    for method in ['shuey', 'aki_richards', 'bortfeld', 'zoeppritz']:
+        Rpp = rppy.reflectivity.interface_avo(vp, vs, rho, theta,
+                                              method=method)
+        assert Rpp.shape == (3, 4)
+        func = getattr(rppy.reflectivity, method)
+        for n in range(3):
+            exp = func(vp[n], vs[n], rho[n], vp[n+1], vs[n+1], rho[n+1],
+                       theta)
+            assert np.allclose(Rpp[n], exp)
+
+    Rpp = rppy.reflectivity.interface_avo(vp, vs, rho, theta,
+                                          method='ruger_vti', e=e, d=d)
+    for n in range(3):
+        exp = rppy.reflectivity.ruger_vti(vp[n], vs[n], rho[n], e[n], d[n],
+                                          vp[n+1], vs[n+1], rho[n+1],
+                                          e[n+1], d[n+1], theta)
+        assert np.allclose(Rpp[n], exp)
+
+    Rpp = rppy.reflectivity.interface_avo(vp, vs, rho, theta,
+                                          method='ruger_hti',
+                                          e=e, d=d, y=y, phi=45)
+    for n in range(3):
+        exp = rppy.reflectivity.ruger_hti(vp[n], vs[n], rho[n],
+                                          e[n], d[n], y[n],
+                                          vp[n+1], vs[n+1], rho[n+1],
+                                          e[n+1], d[n+1], y[n+1], theta, 45)
+        assert np.allclose(Rpp[n], exp)
+
+
+def test_interface_coefficients():
+    vp = np.array([3000., 4000., 3500., 3800.])
+    vs = np.array([1500., 2000., 1700., 1900.])
+    rho = np.array([2000., 2200., 2100., 2250.])
+    theta = np.array([0., 10., 20., 30.])
+
+    # A ray parameter per interface reproduces the angle-domain results.
+    p = np.sin(np.radians(theta))[None, :] / vp[:-1, None]
+    out = rppy.reflectivity.interface_coefficients(vp, vs, rho, p)
+    assert out['Rpp'].shape == (3, 4)
+    assert np.allclose(out['Rpp'],
+                       rppy.reflectivity.interface_avo(vp, vs, rho, theta,
+                                                       method='zoeppritz'))
+    for n in range(3):
+        exp = rppy.reflectivity.zoeppritz_coefficients(
+            vp[n], vs[n], rho[n], vp[n+1], vs[n+1], rho[n+1], theta)
+        assert np.allclose(out['Rps'][n], exp['Rps'])
+
+    # A single row of slownesses is shared by every interface, and the
+    # linearized coefficients follow the exact ones for weak contrasts.
+    vp = np.array([3000., 3150., 2900.])
+    vs = np.array([1500., 1600., 1400.])
+    rho = np.array([2000., 2050., 2010.])
+    p = np.linspace(0, 1.5e-4, 5)
+    exact = rppy.reflectivity.interface_coefficients(vp, vs, rho, p)
+    linear = rppy.reflectivity.interface_coefficients(vp, vs, rho, p,
+                                                      method='aki_richards')
+    assert linear['Rpp'].shape == (2, 5)
+    assert np.allclose(linear['Rpp'], exact['Rpp'], atol=2e-3)
+    assert np.allclose(linear['Rps'], exact['Rps'], atol=2e-3)
+
+
+def test_angle_basis():
+    vp1 = np.array([3000., 2500.])
+    vs1 = np.array([1500., 1200.])
+    p1 = np.array([2000., 2100.])
+    vp2 = np.array([4000., 2700.])
+    vs2 = np.array([2000., 1500.])
+    p2 = np.array([2200., 2200.])
+    theta = np.arange(0, 35, 5)
+
+    basis = rppy.reflectivity.AngleBasis(theta)
+
+    Rpp = basis.ruger_vti(vp1, vs1, p1, 0, 0, vp2, vs2, p2, 0.1, 0.1)
+    assert Rpp.shape == (2, len(theta))
+    for n in range(2):
+        exp = rppy.reflectivity.ruger_vti(vp1[n], vs1[n], p1[n], 0, 0,
+                                          vp2[n], vs2[n], p2[n], 0.1, 0.1,
+                                          theta)
+        assert np.allclose(Rpp[n], exp)
+
+    # Shuey on the incidence angle stays close to the mean-angle form.
+    Rpp = basis.shuey_incidence(vp1, vs1, p1, vp2, vs2, p2)
+    t = np.radians(theta)
+    for n in range(2):
+        A, B, C = rppy.reflectivity.shuey_terms(vp1[n], vs1[n], p1[n],
+                                                vp2[n], vs2[n], p2[n])
+        exp = A + B*np.sin(t)**2 + C*(np.tan(t)**2 - np.sin(t)**2)
+        assert np.allclose(Rpp[n], exp)
+        exp = rppy.reflectivity.shuey(vp1[n], vs1[n], p1[n],
+                                      vp2[n], vs2[n], p2[n], theta)
+        assert np.allclose(Rpp[n], exp, atol=0.01)
+
+    phi = np.arange(0, 90, 10)
+    basis = rppy.reflectivity.AngleBasis(30, phi)
+    Rpp = basis.ruger_hti(vp1, vs1, p1, 0, 0, 0, vp2, vs2, p2, 0.1, 0.1, 0.3)
+    for n in range(2):
+        exp = rppy.reflectivity.ruger_hti(vp1[n], vs1[n], p1[n], 0, 0, 0,
+                                          vp2[n], vs2[n], p2[n],
+                                          0.1, 0.1, 0.3, 30, phi)
+        assert np.allclose(Rpp[n], exp)
+
+    basis = rppy.reflectivity.AngleBasis(theta[:, None], phi)
+    Rpp = basis.vavrycuk_psencik_hti(vp1, vs1, p1, 0, 0, 0,
+                                     vp2, vs2, p2, 0.1, 0.05, 0.3)
+    assert Rpp.shape == (2, len(theta), len(phi))
+    for n in range(2):
+        exp = rppy.reflectivity.vavrycuk_psencik_hti(
+            vp1[n], vs1[n], p1[n], 0, 0, 0, vp2[n], vs2[n], p2[n],
+            0.1, 0.05, 0.3, phi, theta[:, None])
+        assert np.allclose(Rpp[n], exp)
+
+
+def test_avo_terms():
+    vp1 = np.full(1000, 3000.)
+    vs1 = np.full(1000, 1500.)
+    p1 = np.full(1000, 2000.)
+    vp2 = np.linspace(2500., 4000., 1000)
+    vs2 = np.linspace(1200., 2000., 1000)
+    p2 = np.linspace(1900., 2200., 1000)
+
+    terms = rppy.reflectivity.shuey_terms(vp1, vs1, p1, vp2, vs2, p2)
+    assert terms.shape == (1000, 3)
+    Z1 = p1*vp1
+    Z2 = p2*vp2
+    assert np.allclose(terms[:, 0], (Z2 - Z1)/(Z2 + Z1), atol=5e-3)
+
+    terms = rppy.reflectivity.ruger_hti_terms(vp1, vs1, p1, 0, 0, 0,
+                                              vp2, vs2, p2, 0.1, 0.1, 0.3)
+    assert terms.shape == (1000, 6)
+
+    theta = np.array([10., 25., 40.])
+    phi = np.array([0., 45., 90.])
+    Rpp = rppy.reflectivity.AngleBasis(theta, phi).synthesize(terms)
+    exp = rppy.reflectivity.ruger_hti(vp1[:, None], vs1[:, None], p1[:, None],
+                                      0, 0, 0,
+                                      vp2[:, None], vs2[:, None], p2[:, None],
+                                      0.1, 0.1, 0.3, theta, phi)
+    assert np.allclose(Rpp, exp)
+
+
 def test_smith_gidlow_against_crewes():
     err = 0.05
     vp1 = 3000
@@ -456,6 +761,340 @@ def test_exact_orth_against_crewes():
         assert np.abs(Rpp - exp[ind])/exp[ind] < err
 
 
+def test_exact_ortho_batched():
+    C1 = rppy.reflectivity.Cij(3000, 1500, 2000, 0, 0, 0, 0, 0, 0, 0)
+    C2 = rppy.reflectivity.Cij(4000, 2000, 2200, 0, 0, 0, 0, 0, 0, 0)
+
+    # Isotropic layers reduce to the Zoeppritz equations at every azimuth.
+    theta = np.arange(0, 45, 5)
+    phi = np.array([0, 30, 60])[:, None]
+    Rpp = rppy.reflectivity.exact_ortho(C1, 2000, C2, 2200, 0, 0, phi, theta)
+    exp = rppy.reflectivity.zoeppritz(3000, 1500, 2000, 4000, 2000, 2200,
+                                      theta)
+    assert Rpp.shape == (3, len(theta))
+    assert np.allclose(Rpp, exp, atol=1e-10)
+
+    # The solution is deterministic, so repeated calls agree bitwise.
+    again = rppy.reflectivity.exact_ortho(C1, 2000, C2, 2200, 0, 0, phi, theta)
+    assert np.array_equal(Rpp, again)
+
+    # A stack of stiffness matrices is evaluated in the same call.
+    C2 = np.array([rppy.reflectivity.Cij(4000, 2000, 2200,
+                                         0, 0, 0, e, e, 0, 0)
+                   for e in [0, 0.1]])
+    Rpp = rppy.reflectivity.exact_ortho(C1, 2000, C2, 2200, 0, 0, 0, 30)
+    assert Rpp.shape == (2,)
+    for n in range(2):
+        exp = rppy.reflectivity.exact_ortho(C1, 2000, C2[n], 2200,
+                                            0, 0, 0, 30)
+        assert np.abs(Rpp[n] - exp) < 1e-12
+
+
+def test_cubic_roots():
+    # Three real roots, a complex pair and a triple root in one call.
+    z = rppy.reflectivity.cubic_roots([1, 1, 2], [-6, 0, -6],
+                                      [11, 1, 6], [-6, 0, -2])
+    assert z.shape == (3, 3)
+    assert np.allclose(z[0], [1, 2, 3])
+    assert np.allclose(z[1].real, 0)
+    assert np.allclose(np.sort(z[1].imag), [-1, 0, 1])
+    assert np.allclose(z[2], [1, 1, 1], atol=1e-5)
+
+    # Vertical slownesses of an orthorhombic medium against np.roots.
+    C = rppy.reflectivity.Cij(3000, 1500, 2000, 0.2, 0.1, 0.15,
+                              0.1, 0.05, 0.1, 0.03)
+    s1 = np.linspace(0, 1/3500., 25)
+    coeffs = rppy.reflectivity.monoclinic_bicubic_coeffs(s1, 0.3*s1, 2000, C)
+    z = rppy.reflectivity.cubic_roots(*coeffs)
+    for n, abcd in enumerate(zip(*np.broadcast_arrays(*coeffs))):
+        assert np.allclose(z[n], np.sort(np.roots(abcd)), rtol=1e-12)
+
+    # The double shear root of an isotropic medium survives polishing.
+    C = rppy.reflectivity.Cij(3000, 1500, 2000, 0, 0, 0, 0, 0, 0, 0)
+    s1 = np.sin(np.radians(np.arange(0, 45, 5)))/3000
+    coeffs = rppy.reflectivity.monoclinic_bicubic_coeffs(s1, 0*s1, 2000, C)
+    z = rppy.reflectivity.cubic_roots(*coeffs)
+    assert np.allclose(z[:, 0], 1/3000.**2 - s1**2, rtol=1e-10)
+    assert np.allclose(z[:, 1:], (1/1500.**2 - s1**2)[:, None], rtol=1e-6)
+
+
+def test_christoffel():
+    # Random triclinic stiffness matrices against the explicit contraction
+    # G_ik = c_ijkl s_j s_l over the fourth-order stiffness tensor.
+    rng = np.random.RandomState(0)
+    C = rng.rand(4, 6, 6)
+    C = C + np.swapaxes(C, -1, -2)
+    s = rng.randn(4, 3)
+    voigt = [[0, 5, 4], [5, 1, 3], [4, 3, 2]]
+    exp = np.zeros((4, 3, 3))
+    for n in range(4):
+        for i, j, k, l in np.ndindex(3, 3, 3, 3):
+            exp[n, i, k] += (C[n, voigt[i][j], voigt[k][l]] *
+                             s[n, j]*s[n, l])
+
+    G = rppy.reflectivity.christoffel(C, s)
+    assert G.shape == (4, 3, 3)
+    assert np.allclose(G, exp)
+
+    # A single stiffness matrix is broadcast over a stack of slownesses.
+    G = rppy.reflectivity.christoffel(C[0], s)
+    assert np.allclose(G[1], rppy.reflectivity.christoffel(C[0], s[1]))
+
+
+def test_cij_thomsen_stack():
+    e = np.array([0, 0.1, 0.2])
+    C = rppy.reflectivity.Cij(3000, 1500, 2000, e, e/2, e, e, e/2, e, 0)
+    assert C.shape == (3, 6, 6)
+    assert np.allclose(C[1], rppy.reflectivity.Cij(3000, 1500, 2000, 0.1,
+                                                   0.05, 0.1, 0.1, 0.05,
+                                                   0.1, 0))
+
+    vp, vs, e1, d1, y1, e2, d2, y2, d3 = rppy.reflectivity.thomsen(C, 2000)
+    assert np.allclose(vp, 3000)
+    assert np.allclose(e1, e)
+    assert np.allclose(d2, e/2)
+
+
+def test_velocity_surface():
+    # Isotropic medium: phase and group velocities coincide with n.
+    C = rppy.reflectivity.Cij(3000, 1500, 2000, 0, 0, 0, 0, 0, 0, 0)
+    n = rppy.slowness.direction(np.arange(0, 91, 15), 30)
+    surf = rppy.slowness.velocity_surface(C, 2000, n)
+    assert surf['phase'].shape == (7, 3)
+    assert np.allclose(surf['phase'], [3000, 1500, 1500])
+    assert np.allclose(surf['group'][:, 0], 3000*n)
+    assert np.allclose(surf['polarization'][:, 0], n)
+
+    # VTI medium: the group velocity follows from the phase velocity as
+    # V = v n + dv/dtheta t, and satisfies V.s = 1 for every mode.
+    C = rppy.reflectivity.Cij(3000, 1500, 2000, 0.2, 0.1, 0.15,
+                              0.2, 0.1, 0.15, 0)
+    theta = 37
+    h = 1e-4
+    surf = rppy.slowness.velocity_surface(
+        C, 2000, rppy.slowness.direction([theta - h, theta, theta + h]))
+    v = surf['phase'][1]
+    dv = (surf['phase'][2] - surf['phase'][0]) / (2*np.radians(h))
+    t = np.radians(theta)
+    exp = np.array([v*np.sin(t) + dv*np.cos(t), v*np.cos(t) - dv*np.sin(t)])
+    assert np.allclose(surf['group'][1][:, [0, 2]], exp.T, rtol=1e-6)
+    assert np.allclose(np.sum(surf['group']*surf['slowness'], axis=-1), 1)
+
+    # Stacks of stiffness matrices against stacks of directions.
+    e = np.linspace(0, 0.2, 4)
+    C = rppy.reflectivity.Cij(3000, 1500, 2000, e, e/2, e, e, e/2, e, 0)
+    n = rppy.slowness.direction(np.arange(0, 91, 10))
+    surf = rppy.slowness.velocity_surface(C[:, None], 2000, n[None, :])
+    assert surf['group'].shape == (4, 10, 3, 3)
+    exp = rppy.slowness.velocity_surface(C[2], 2000, n[5])
+    assert np.allclose(surf['phase'][2, 5], exp['phase'])
+
+
+def test_offset_to_angle():
+    # Homogeneous model: both methods reduce to straight-ray geometry.
+    z = np.arange(1, 101)*10.
+    vp = np.full(100, 2500.)
+    x = np.array([0., 500., 1000., 2000.])
+    exp = np.degrees(np.arctan(x/(2*z[:, None])))
+    for method in ['straight', 'raytrace']:
+        theta = rppy.offset.offset_to_angle(vp, z, x, method=method)
+        assert theta.shape == (100, 4)
+        assert np.allclose(theta, exp, atol=1e-3)
+
+    # Two layers: the traced ray obeys Snell's law and reaches the offset.
+    z = np.array([500., 800.])
+    vp = np.array([2000., 3000.])
+    theta = rppy.offset.offset_to_angle(vp, z, x, method='raytrace',
+                                        chunk=1)
+    p = np.sin(np.radians(theta[1]))/vp[1]
+    offset = (2*500*np.tan(np.arcsin(p*vp[0])) +
+              2*300*np.tan(np.arcsin(p*vp[1])))
+    assert np.allclose(offset, x, atol=0.1)
+
+    # The result does not depend on how the samples are chunked.
+    rng = np.random.RandomState(0)
+    z = np.arange(1, 301)*5. + 500
+    vp = np.linspace(1800, 4000, 300) + rng.randn(300)*100
+    x = np.linspace(0, 3000, 20)
+    a = rppy.offset.offset_to_angle(vp, z, x, method='raytrace', chunk=7)
+    b = rppy.offset.offset_to_angle(vp, z, x, method='raytrace', chunk=1000)
+    assert not np.any(np.isnan(a))
+    assert np.allclose(a, b)
+
+    # A log starting at the datum has a reflector there, reached by
+    # horizontal rays at any non-zero offset.
+    z = np.arange(100)*10.
+    vp = np.full(100, 2500.)
+    x = np.array([0., 500., 1000.])
+    t0, vrms = rppy.offset.rms_velocity(vp, z)
+    assert t0[0] == 0 and np.allclose(vrms, 2500.)
+    exp = np.degrees(np.arctan2(x, 2*z[:, None]))
+    for method in ['straight', 'raytrace']:
+        theta = rppy.offset.offset_to_angle(vp, z, x, method=method)
+        assert np.allclose(theta, exp, atol=1e-3)
+
+
+def test_synthetic_gather():
+    # FFT convolution matches np.convolve trace by trace.
+    rng = np.random.RandomState(0)
+    r = rng.randn(200, 3)
+    for wvlt in [rppy.util.ricker(30, np.arange(-0.05, 0.0505, 0.001)),
+                 rppy.util.ricker(30, np.arange(-0.05, 0.05, 0.001))]:
+        s = rppy.synthetic.convolve(r, wvlt, axis=0)
+        for n in range(3):
+            assert np.allclose(s[:, n], np.convolve(r[:, n], wvlt, 'same'))
+
+    # A single contrast lands at its two-way time with the reflectivity of
+    # the chosen model, and the gather is the scaled wavelet.
+    z = np.array([100., 200., 300.])
+    vp = np.array([2000., 2000., 3000.])
+    vs = np.array([1000., 1000., 1500.])
+    rho = np.array([2000., 2000., 2200.])
+    theta = np.array([0., 15., 30.])
+    wvlt = rppy.util.ricker(30, np.arange(-0.05, 0.0505, 0.001))
+    out = rppy.synthetic.synthetic_gather(vp, vs, rho, z, theta, wvlt,
+                                          0.001, method='zoeppritz')
+    assert np.allclose(rppy.synthetic.depth_to_time(vp, z)[:2], [0.1, 0.2])
+    exp = rppy.reflectivity.zoeppritz(2000, 1000, 2000, 3000, 1500, 2200,
+                                      theta)
+    peak = np.argmax(np.abs(out['reflectivity'][:, 0]))
+    assert out['gather'].shape == (len(out['t']), 3)
+    assert np.isclose(out['t'][peak], 0.2)
+    assert np.allclose(out['reflectivity'][peak], exp)
+    assert np.allclose(out['gather'][peak], exp)
+
+    # A post-critical angle is muted, leaving the other traces intact.
+    theta = np.array([0., 15., 60.])
+    out = rppy.synthetic.synthetic_gather(vp, vs, rho, z, theta, wvlt,
+                                          0.001, method='zoeppritz')
+    assert np.all(np.isfinite(out['gather']))
+    assert np.allclose(out['gather'][peak], [exp[0], exp[1], 0])
+
+
+def test_wavelet_bank():
+    rng = np.random.RandomState(0)
+    t = np.arange(-0.05, 0.0505, 0.001)
+    wvlts = np.array([rppy.util.ricker(f, t) for f in [20, 30, 40]])
+    bank = rppy.synthetic.WaveletBank(wvlts)
+    assert bank.shape == (3,)
+
+    # One wavelet per trace, with the traces along either axis.
+    r = rng.randn(3, 300)
+    s = rppy.synthetic.convolve(r, bank)
+    for n in range(3):
+        assert np.allclose(s[n], np.convolve(r[n], wvlts[n], 'same'))
+    assert np.allclose(rppy.synthetic.convolve(r.T, bank, axis=0), s.T)
+
+    # The function and the method share their default (time last) axis.
+    assert np.allclose(bank.convolve(r), s)
+    assert np.allclose(rppy.synthetic.convolve(r, wvlts[1]),
+                       rppy.synthetic.WaveletBank(wvlts[1]).convolve(r))
+
+    # Spectra are computed once per transform length.
+    assert bank.spectrum(512) is bank.spectrum(512)
+    assert not bank.wavelet.flags.writeable
+
+
+def test_wavelet_cache():
+    # Memoized, read-only wavelets on the same samples as ricker.
+    w = rppy.util.wavelet(30, 0.001, 101)
+    assert w is rppy.util.wavelet(30, 0.001, 101)
+    assert not w.flags.writeable
+    assert np.allclose(w, rppy.util.ricker(30, np.arange(-50, 51)*0.001))
+
+    # Closed-form spectra match the FFT of a long sampled wavelet.
+    n = 4095
+    wl = rppy.util.wavelet(30, 0.001, n)
+    W = rppy.util.wavelet_spectrum(30, 0.001, n)
+    assert not W.flags.writeable
+    assert np.allclose(W, np.fft.rfft(np.fft.ifftshift(wl)).real)
+
+    # Ormsby trapezoid has its corners at pi*f, as in ormsby.
+    freq = np.pi*np.array([2, 7, 25, 40, 60])
+    assert np.allclose(rppy.util.ormsby_spectrum(freq, 5, 10, 40, 50),
+                       [0, 0.4, 1, 1, 0])
+
+    # Banks built from closed-form spectra convolve like sampled ones.
+    r = np.random.RandomState(0).randn(300)
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        bank = rppy.synthetic.WaveletBank.analytic(30, 0.001, 101)
+    assert np.allclose(rppy.synthetic.convolve(r, bank),
+                       np.convolve(r, w, 'same'))
+
+    # Too few samples truncate the wavelet away from its closed form.
+    with pytest.warns(RuntimeWarning):
+        rppy.synthetic.WaveletBank.analytic(30, 0.001, 51)
+
+
+def test_kennett():
+    # A single interface is its scattering matrix, delayed through the top.
+    p = np.array([0, 1e-4, 2e-4, 6e-4])
+    w = 2*np.pi*np.array([0., 10., 30.])
+    R = rppy.kennett.layer_response([2000., 3000.], [1000., 1500.],
+                                    [2000., 2200.], [100., 200.], p, w)
+    Z = rppy.reflectivity.scattering_matrix(2000, 1000, 2000,
+                                            3000, 1500, 2200, p)[:, None]
+    qp = rppy.reflectivity.vertical_slowness(2000, p)[:, None]
+    qs = rppy.reflectivity.vertical_slowness(1000, p)[:, None]
+    assert np.allclose(R['Rpp'], Z[..., 0, 0]*np.exp(2j*w*qp*100))
+    assert np.allclose(R['Rps'], Z[..., 1, 0]*np.exp(1j*w*(qp + qs)*100))
+
+    # At normal incidence a layer reverberates as in the acoustic case,
+    # and a free surface adds its multiples with reflection coefficient -1.
+    z = np.array([100., 300., 400.])
+    vp = np.array([2000., 2500., 3000.])
+    rho = np.array([2000., 2100., 2200.])
+    ai = vp*rho
+    r1 = (ai[1] - ai[0])/(ai[1] + ai[0])
+    r2 = (ai[2] - ai[1])/(ai[2] + ai[1])
+    w = 2*np.pi*np.linspace(0, 80, 9) + 0.3j
+    e0 = np.exp(2j*w*100/2000)
+    e1 = np.exp(2j*w*200/2500)
+    exp = e0*(r1 + (1 - r1**2)*r2*e1/(1 + r1*r2*e1))
+    R = rppy.kennett.layer_response(vp, vp/2, rho, z, 0, w)
+    assert np.allclose(R['Rpp'][0], exp)
+    R = rppy.kennett.layer_response(vp, vp/2, rho, z, 0, w,
+                                    free_surface=True)
+    assert np.allclose(R['Rpp'][0], exp/(1 + exp))
+
+    # At oblique incidence the surface multiples are R (I - F R)^-1, with F
+    # the free-surface reflection matrix (Aki and Richards [1980], 5.31).
+    p = np.array([1e-4, 3e-4])
+    R = rppy.kennett.layer_response(vp, vp/2, rho, z, p, w)
+    Rfs = rppy.kennett.layer_response(vp, vp/2, rho, z, p, w,
+                                      free_surface=True)
+    R = np.stack([np.stack([R['Rpp'], R['Rsp']], -1),
+                  np.stack([R['Rps'], R['Rss']], -1)], -2)
+    qp = rppy.reflectivity.vertical_slowness(vp[0], p)
+    qs = rppy.reflectivity.vertical_slowness(vp[0]/2, p)
+    a = (4/vp[0]**2 - 2*p**2)**2
+    b = 4*p**2*qp*qs
+    c = 4*p*(4/vp[0]**2 - 2*p**2)/(a + b)
+    F = np.array([[(b - a)/(a + b), qs*c/2], [2*qp*c, (a - b)/(a + b)]])
+    F = np.moveaxis(F, -1, 0)[:, None]
+    M = np.eye(2) - np.matmul(F, R)
+    exp = np.swapaxes(np.linalg.solve(np.swapaxes(M, -1, -2),
+                                      np.swapaxes(R, -1, -2)), -1, -2)
+    assert np.allclose(Rfs['Rpp'], exp[..., 0, 0])
+    assert np.allclose(Rfs['Rps'], exp[..., 1, 0])
+    assert np.allclose(Rfs['Rss'], exp[..., 1, 1])
+
+    # Serial, blocked and parallel evaluations agree.
+    p = np.linspace(0, 3e-4, 20)
+    R = rppy.kennett.layer_response(vp, vp/2, rho, z, p, w)
+    for kw in [{'block': 1}, {'workers': 2}]:
+        Rk = rppy.kennett.layer_response(vp, vp/2, rho, z, p, w, **kw)
+        assert np.allclose(Rk['Rps'], R['Rps'])
+
+    # Primaries with transmission loss, and the first internal multiple.
+    wvlt = rppy.util.wavelet(30, 0.001, 101)
+    g = rppy.kennett.plane_wave_gather(vp, vp/2, rho, z, [0.], wvlt,
+                                       0.001, 1000)
+    assert g['Rpp'].shape == (1000, 1)
+    assert np.allclose(g['Rpp'][[100, 260, 420], 0],
+                       [r1, (1 - r1**2)*r2, -(1 - r1**2)*r1*r2**2])
+
 # Test media.py
 #def test_han_eberhart_phillips():
 #    assert 0 == 1
@@ -516,6 +1155,37 @@ def test_hashin_shtrikman():
     assert np.abs(ul - ule)/Kue < err
 
 
+def test_backus():
+    # Alternating layers of equal thickness, averaged over whole periods.
+    n = 100
+    z = np.arange(1., n + 1)
+    vp = np.where(np.arange(n) % 2, 3000., 2000.)
+    vs = np.where(np.arange(n) % 2, 1700., 1000.)
+    rho = np.where(np.arange(n) % 2, 2400., 2100.)
+    out = rppy.media.backus(vp, vs, rho, z, [0., 10., 20.])
+    assert out['C'].shape == (3, n, 6, 6)
+
+    u = rho[:2]*vs[:2]**2
+    L = rho[:2]*vp[:2]**2 - 2*u
+    C33 = 1/np.mean(1/(L + 2*u))
+    C11 = (np.mean(4*u*(L + u)/(L + 2*u)) +
+           C33*np.mean(L/(L + 2*u))**2)
+    C13 = C33*np.mean(L/(L + 2*u))
+    C55 = 1/np.mean(1/u)
+    C66 = np.mean(u)
+    for key, exp in zip(['C11', 'C13', 'C33', 'C55', 'C66'],
+                        [C11, C13, C33, C55, C66]):
+        assert np.allclose(out[key][1:, 40:60], exp)
+    assert np.allclose(out['rho'][1:, 40:60], 2250.)
+    assert np.all(out['y'][1:, 40:60] > 0)
+    assert np.allclose(out['e'][2, 50], (C11 - C33)/(2*C33))
+
+    # A zero-length window returns the isotropic logs themselves.
+    assert np.allclose(out['vp'][0], vp)
+    assert np.allclose(out['vs'][0], vs)
+    assert np.allclose([out['e'][0], out['d'][0], out['y'][0]], 0)
+
+
 #def test_voight_reuss_hill():
 #    assert 0 == 1
 
@@ -736,6 +1406,28 @@ def test_Vs():
     assert np.abs(rppy.moduli.Vs(rho, u=u, L=L) - Vs)/Vs < err
 
 
+def test_moduli_arrays():
+    # Whole logs convert in one call, sample for sample.
+    Vp = np.array([2000., 3000., 4500.])
+    Vs = np.array([800., 1500., 2600.])
+    rho = np.array([2100., 2300., 2600.])
+    u = rppy.moduli.shear(Vp=Vp, Vs=Vs, rho=rho)
+    K = rppy.moduli.bulk(Vp=Vp, Vs=Vs, rho=rho)
+    E = rppy.moduli.youngs(u=u, K=K)
+    v = rppy.moduli.poissons(u=u, K=K)
+    L = rppy.moduli.lame(u=u, K=K)
+    for n in range(3):
+        assert np.isclose(E[n], rppy.moduli.youngs(Vp=Vp[n], Vs=Vs[n],
+                                                   rho=rho[n]))
+    assert np.allclose(rppy.moduli.Vp(rho, E=E, v=v), Vp)
+    assert np.allclose(rppy.moduli.Vs(rho, K=K, L=L), Vs)
+
+    # Zero is a value, not a missing argument.
+    assert np.isclose(rppy.moduli.Vp(1000., u=0., K=2.25e9), 1500.)
+    assert rppy.moduli.Vs(1000., u=0.) == 0
+    assert rppy.moduli.poissons(u=np.zeros(2), K=np.ones(2))[0] == 0.5
+
+
 # Test util.py
 def test_tuning_wedge():
     err = 0.005
@@ -786,3 +1478,222 @@ def test_ormsby():
     wvlt = rppy.util.ormsby(t, lc, lf, hf, hc)
 
     assert np.allclose(w, wvlt, rtol=1e-05, atol=1e-08)
+
+
+# Test las.py
+LAS = """~Version Information Section
+VERS.   2.0 : CWLS Log ASCII Standard - VERSION 2.0
+WRAP.   NO  : One Line per depth Step
+~Well Information Section
+STRT.M      100.0 : Start Depth
+STOP.M      100.3 : Stop Depth
+STEP.M        0.1 : Step
+NULL.     -999.25 : Null Value
+~Curve Information Section
+DEPT .M           : Depth
+DT   .US/M        : Sonic
+RHOB .G/C3        : Bulk Density
+~Ascii
+ 100.0   350.0   2.10
+ 100.1   340.5   -999.25
+ 100.2   330.25  2.20
+ 100.3   320.0   2.25
+"""
+
+
+def test_las_reader():
+    las = rppy.las.LASReader(io.StringIO(LAS), null_subs=np.nan)
+    assert las.curves.names == ['DEPT', 'DT', 'RHOB']
+    assert np.allclose(las.data['DEPT'], [100., 100.1, 100.2, 100.3])
+    assert np.allclose(las.data['DT'], [350., 340.5, 330.25, 320.])
+    assert las.data2d.shape == (4, 3)
+    assert np.isnan(las.data['RHOB'][1])
+
+    # The records are a view of the 2D array, and both of one buffer.
+    assert np.shares_memory(las.data, las.data2d)
+    assert las.data2d.flags.c_contiguous
+
+    # Comment lines in the data are skipped.
+    text = LAS.replace(' 100.2', '# a comment\n 100.2')
+    las = rppy.las.LASReader(io.StringIO(text))
+    assert np.allclose(las.data['RHOB'], [2.1, -999.25, 2.2, 2.25])
+
+    # Rows must hold a value for every curve.
+    text = LAS.replace('   2.25\n', '\n')
+    with pytest.raises(rppy.las.LASError):
+        rppy.las.LASReader(io.StringIO(text))
+
+    # The data can be replaced, as with any attribute.
+    las.data2d = las.data2d[:2]
+    assert las.data2d.shape == (2, 3)
+    assert len(las.data) == 4
+
+
+def test_las_wrapped():
+    # Wrapped rows: depth on its own line, then the other curves.
+    text = LAS.replace('WRAP.   NO ', 'WRAP.   YES')
+    head, body = text.split('~Ascii\n')
+    rows = [line.split() for line in body.splitlines()]
+    body = ''.join('%s\n %s\n %s\n' % tuple(r) for r in rows)
+    las = rppy.las.LASReader(io.StringIO(head + '~Ascii\n' + body))
+    assert las.wrap
+    ref = rppy.las.LASReader(io.StringIO(LAS))
+    assert np.array_equal(las.data2d, ref.data2d)
+    assert np.shares_memory(las.data, las.data2d)
+
+    # A missing value, or one that is not a number, is an error rather
+    # than the end of the data.
+    for bad in [body[:body.rindex('2.25')], body.replace('330.25', 'x')]:
+        with pytest.raises(rppy.las.LASError):
+            rppy.las.LASReader(io.StringIO(head + '~Ascii\n' + bad))
+
+
+def test_las_cache():
+    d = tempfile.mkdtemp()
+    try:
+        path = os.path.join(d, 'well.las')
+        with open(path, 'w') as f:
+            f.write(LAS)
+
+        # The first read parses the file and writes the cache beside it.
+        las = rppy.las.LASReader(path, cache=True)
+        assert not las.cached
+        assert os.path.exists(path + '.npy')
+        assert os.path.exists(path + '.json')
+
+        # Later reads map the cached data, with the same header.
+        cached = rppy.las.LASReader(path, null_subs=np.nan, cache=True)
+        assert cached.cached
+        assert isinstance(cached.data2d, np.memmap)
+        assert cached.curves.names == las.curves.names
+        assert cached.curves.DT.units == 'US/M'
+        assert (cached.null, cached.step, cached.wrap) == (-999.25, 0.1,
+                                                           False)
+        assert np.isnan(cached.data['RHOB'][1])
+        assert np.allclose(cached.data['DT'], las.data['DT'])
+
+        # Substituting nulls did not write through to the cache.
+        assert not rppy.las.LASReader(path, cache=True).data2d.flags.writeable
+        assert rppy.las.LASReader(path, cache=True).data['RHOB'][1] == -999.25
+
+        # A changed file is parsed again, and so is a corrupt cache.
+        with open(path, 'a') as f:
+            f.write(' 100.4   310.0   2.30\n')
+        las = rppy.las.LASReader(path, cache=True)
+        assert not las.cached and len(las.data) == 5
+        with open(path + '.json', 'w') as f:
+            f.write('{')
+        assert not rppy.las.LASReader(path, cache=True).cached
+        assert rppy.las.LASReader(path, cache=True).cached
+
+        # Caches can also live in a directory of their own.
+        cache = os.path.join(d, 'cache')
+        os.mkdir(cache)
+        rppy.las.LASReader(path, cache=cache)
+        assert rppy.las.LASReader(path, cache=cache).cached
+        assert len(os.listdir(cache)) == 2
+    finally:
+        shutil.rmtree(d)
+
+
+def test_las_curves():
+    ref = rppy.las.LASReader(io.StringIO(LAS), null_subs=np.nan)
+
+    # Selected curves, in the order asked for, optionally as float32.
+    las = rppy.las.LASReader(io.StringIO(LAS), null_subs=np.nan,
+                             curves=['RHOB', 'DEPT'], dtype=np.float32)
+    assert las.data.dtype.names == ('RHOB', 'DEPT')
+    assert las.data2d.shape == (4, 2)
+    assert las.data2d.dtype == np.float32
+    assert las.curves.names == ['DEPT', 'DT', 'RHOB']
+    exp = ref.data2d[:, [2, 0]]
+    assert np.array_equal(np.isnan(las.data2d), np.isnan(exp))
+    assert np.allclose(las.data2d[~np.isnan(exp)], exp[~np.isnan(exp)])
+    with pytest.raises(rppy.las.LASError):
+        rppy.las.LASReader(io.StringIO(LAS), curves=['DTS'])
+
+    d = tempfile.mkdtemp()
+    try:
+        path = os.path.join(d, 'well.las')
+        with open(path, 'w') as f:
+            f.write(LAS)
+
+        # A lazy reader reads the header only, and the data when needed,
+        # so it sees the file as it is on first access.
+        las = rppy.las.LASReader(path, curves=['DT'], lazy=True)
+        assert las.step == 0.1
+        with open(path, 'w') as f:
+            f.write(LAS.replace('350.0', '351.0'))
+        assert np.allclose(las.data['DT'], [351., 340.5, 330.25, 320.])
+        with open(path, 'w') as f:
+            f.write(LAS)
+
+        # Assigned data is kept, rather than read.
+        las = rppy.las.LASReader(path, lazy=True)
+        las.data = ref.data[:2]
+        assert len(las.data) == 2
+        assert len(las.data2d) == 4
+
+        # Selections are cut from a cache of every curve.
+        for n in range(2):
+            las = rppy.las.LASReader(path, curves=['DT'], dtype=np.float32,
+                                     cache=True, lazy=True)
+            assert las.cached == bool(n)
+            assert las.data2d.shape == (4, 1)
+            assert np.allclose(las.data['DT'], ref.data['DT'])
+        assert rppy.las.LASReader(path, cache=True).data2d.shape == (4, 3)
+    finally:
+        shutil.rmtree(d)
+
+
+def test_las_chunks():
+    ref = rppy.las.LASReader(io.StringIO(LAS), null_subs=np.nan)
+
+    # Wrapped copy of the test file, with one value per line.
+    head, body = LAS.replace('WRAP.   NO ', 'WRAP.   YES').split('~Ascii\n')
+    wrapped = head + '~Ascii\n' + '\n'.join(body.split()) + '\n'
+
+    d = tempfile.mkdtemp()
+    try:
+        for n, text in enumerate([LAS, wrapped]):
+            path = os.path.join(d, 'well%d.las' % n)
+            with open(path, 'w') as f:
+                f.write(text)
+
+            # Streamed from the file, from the cache, and from memory.
+            for kw in [{'lazy': True}, {'cache': True}, {'cache': True},
+                       {}]:
+                las = rppy.las.LASReader(path, null_subs=np.nan, **kw)
+                chunks = list(las.chunks(3))
+                assert [len(c) for c in chunks] == [3, 1]
+                data = np.concatenate(chunks)
+                for name in ref.curves.names:
+                    nan = np.isnan(ref.data[name])
+                    assert np.array_equal(np.isnan(data[name]), nan)
+                    assert np.array_equal(data[name][~nan],
+                                          ref.data[name][~nan])
+
+            # Selected curves as float32, in 2D blocks.
+            las = rppy.las.LASReader(path, null_subs=np.nan, lazy=True,
+                                     curves=['RHOB', 'DT'], dtype=np.float32)
+            chunks = list(las.chunks(2, structured=False))
+            assert [c.shape for c in chunks] == [(2, 2), (2, 2)]
+            assert chunks[0].dtype == np.float32
+            data = np.concatenate(chunks)
+            exp = ref.data2d[:, [2, 1]]
+            assert np.array_equal(np.isnan(data), np.isnan(exp))
+            assert np.allclose(data[~np.isnan(exp)], exp[~np.isnan(exp)])
+
+            # Streaming did not read the data in full, so it is read anew.
+            with open(path, 'w') as f:
+                f.write(text.replace('350.0', '351.0'))
+            assert las.data['DT'][0] == 351.
+
+        # A wrapped file that ends part way through a row.
+        path = os.path.join(d, 'bad.las')
+        with open(path, 'w') as f:
+            f.write(wrapped[:wrapped.rindex('2.25')])
+        with pytest.raises(rppy.las.LASError):
+            list(rppy.las.LASReader(path, lazy=True).chunks(2))
+    finally:
+        shutil.rmtree(d)